@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keuangan_store import COLUMNS, DEFAULT_KATEGORI_MAP  # noqa: E402
+
+# =======================================================================================
+# POLA JURNAL SINTETIS
+# =======================================================================================
+# (akun debit, akun kredit, bobot, deskripsi) — jurnal berpasangan yang umum di UMKM
+JOURNAL_PATTERNS = [
+    ("Kas", "Pendapatan", 30, "Penjualan tunai"),
+    ("Piutang", "Pendapatan", 12, "Penjualan kredit"),
+    ("Kas", "Piutang", 10, "Pelunasan piutang"),
+    ("Beban", "Kas", 20, "Pembayaran beban operasional"),
+    ("Persediaan", "Utang", 8, "Pembelian persediaan kredit"),
+    ("Utang", "Bank", 7, "Pembayaran utang via transfer"),
+    ("Bank", "Kas", 6, "Setoran kas ke bank"),
+    ("Peralatan", "Bank", 2, "Pembelian peralatan"),
+    ("Kas", "Modal", 1, "Setoran modal pemilik"),
+    ("Beban", "Bank", 4, "Pembayaran gaji via transfer"),
+]
+
+
+def generate_ledger(n_rows, seed=42, start="2020-01-01", days=3 * 365):
+    """Ledger sintetis deterministik sebanyak `n_rows` baris (jurnal debit/kredit berpasangan).
+
+    Memakai akun dan kategori default (`DEFAULT_KATEGORI_MAP`), tanggal tersebar merata
+    selama `days` hari, dan nominal log-normal yang dibulatkan ke ribuan rupiah.
+    """
+    rng = np.random.default_rng(seed)
+    n_entries = (n_rows + 1) // 2
+
+    weights = np.array([p[2] for p in JOURNAL_PATTERNS], dtype=float)
+    pattern = rng.choice(len(JOURNAL_PATTERNS), size=n_entries, p=weights / weights.sum())
+    debit_akun = np.array([p[0] for p in JOURNAL_PATTERNS])[pattern]
+    kredit_akun = np.array([p[1] for p in JOURNAL_PATTERNS])[pattern]
+    deskripsi = np.array([p[3] for p in JOURNAL_PATTERNS])[pattern]
+
+    tanggal = pd.Timestamp(start) + pd.to_timedelta(
+        np.sort(rng.integers(0, days, size=n_entries)), unit="D"
+    )
+    nominal = (np.round(rng.lognormal(mean=13, sigma=1.2, size=n_entries) / 1000) * 1000).astype("int64")
+    nomor = np.char.add(" #", np.arange(1, n_entries + 1).astype(str))
+    deskripsi = np.char.add(deskripsi.astype(str), nomor)
+
+    # Baris debit dan kredit saling berselang: [d0, k0, d1, k1, ...]
+    akun = np.column_stack([debit_akun, kredit_akun]).ravel()
+    frame = pd.DataFrame({
+        "Tanggal": np.repeat(tanggal.to_numpy(), 2),
+        "Deskripsi": np.repeat(deskripsi, 2),
+        "Akun": akun,
+        "Kategori": pd.Series(akun).map(DEFAULT_KATEGORI_MAP).to_numpy(),
+        "Debit": np.column_stack([nominal, np.zeros_like(nominal)]).ravel(),
+        "Kredit": np.column_stack([np.zeros_like(nominal), nominal]).ravel(),
+    })[COLUMNS]
+    return frame.iloc[:n_rows].reset_index(drop=True)
+
+
+def fill_store(store, frame, batch_rows=50_000):
+    """Masukkan ledger sintetis ke LedgerStore per batch (tanpa melewati Ledger)."""
+    columns = [frame[c].tolist() for c in COLUMNS]
+    rows = [dict(zip(COLUMNS, values)) for values in zip(*columns)]
+    for i in range(0, len(rows), batch_rows):
+        store.insert_many(rows[i:i + batch_rows])
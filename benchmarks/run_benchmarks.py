@@ -0,0 +1,189 @@
+"""Benchmark fungsi data dan halaman aplikasi untuk berbagai ukuran ledger.
+
+Contoh:
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --output bench.jsonl
+
+Setiap baris output adalah satu objek JSON:
+    {"benchmark": ..., "kind": "data"|"page", "rows": ..., "wall_s": ..., "peak_mb": ...}
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import keuangan_store  # noqa: E402
+from generate_ledger import fill_store, generate_ledger  # noqa: E402
+from keuangan_export import export_account_ledgers, export_csv, export_excel  # noqa: E402
+from keuangan_ledger import Ledger  # noqa: E402
+
+APP_PATH = os.path.join(ROOT, "streamlit_keuangan.py")
+PAGES = ["Transaksi", "Buku Besar", "Neraca", "Neraca Saldo", "Laba Rugi", "Chart Akun"]
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+ADD_CALLS = 100
+
+
+# =======================================================================================
+# PENGUKURAN
+# =======================================================================================
+def measure(fn, setup=None, repeat=3):
+    """Waktu terbaik dari `repeat` kali (tanpa tracemalloc) dan puncak memori satu kali jalan."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2**20
+
+
+def report(out, name, kind, rows, wall_s, peak_mb, **extra):
+    record = {"benchmark": name, "kind": kind, "rows": rows,
+              "wall_s": round(wall_s, 6), "peak_mb": round(peak_mb, 3), **extra}
+    out.write(json.dumps(record) + "\n")
+    out.flush()
+
+
+# =======================================================================================
+# FUNGSI DATA
+# =======================================================================================
+def bench_data(out, store, rows, repeat):
+    sample = generate_ledger(1, seed=7).iloc[0].to_dict()
+    mid_date = generate_ledger(rows)["Tanggal"].iloc[rows // 2]
+
+    holder = {}
+
+    def load():
+        holder["ledger"] = Ledger(store)
+
+    report(out, "ledger_load", "data", rows, *measure(load, repeat=1))
+    ledger = holder["ledger"]
+
+    # Versi ledger dinaikkan sebelum tiap ukuran agar cache export/as-of tidak terpakai
+    def bump():
+        ledger.add(sample)
+
+    def add_many_single():
+        for _ in range(ADD_CALLS):
+            ledger.add(sample)
+
+    wall, peak = measure(add_many_single, repeat=repeat)
+    report(out, "add_transaction", "data", rows, wall / ADD_CALLS, peak, calls=ADD_CALLS)
+
+    report(out, "frame_view", "data", rows, *measure(lambda: ledger.frame, setup=bump, repeat=repeat))
+    report(out, "export_excel", "data", rows,
+           *measure(lambda: _read(export_excel(ledger)), setup=bump, repeat=1))
+    report(out, "export_csv", "data", rows,
+           *measure(lambda: _read(export_csv(ledger)), setup=bump, repeat=repeat))
+    report(out, "buku_besar_account_ledger", "data", rows,
+           *measure(lambda: ledger.account_ledger("Kas"), setup=bump, repeat=repeat))
+    report(out, "buku_besar_all_accounts", "data", rows,
+           *measure(ledger.all_account_ledgers, setup=bump, repeat=repeat))
+    report(out, "export_account_ledgers", "data", rows,
+           *measure(lambda: _read(export_account_ledgers(ledger)), setup=bump, repeat=1))
+    report(out, "neraca_balance_table", "data", rows,
+           *measure(ledger.balance_table, setup=bump, repeat=repeat))
+    report(out, "neraca_balance_table_as_of", "data", rows,
+           *measure(lambda: ledger.balance_table(mid_date), setup=bump, repeat=repeat))
+    report(out, "period_balance_table", "data", rows,
+           *measure(lambda: ledger.period_balance_table(None, mid_date), setup=bump, repeat=repeat))
+    report(out, "frame_between_month", "data", rows,
+           *measure(lambda: ledger.frame_between(mid_date.replace(day=1), mid_date), repeat=repeat))
+
+
+def _read(data):
+    # Export besar dikembalikan sebagai file; baca supaya biayanya sebanding dengan bytes
+    if isinstance(data, bytes):
+        return data
+    with data:
+        return data.read()
+
+
+# =======================================================================================
+# HALAMAN (STREAMLIT APPTEST, TANPA BROWSER)
+# =======================================================================================
+def bench_pages(out, rows, repeat, timeout):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # Ledger bersama di-cache per proses; kosongkan agar ukuran ini memuat DB-nya sendiri
+    st.cache_resource.clear()
+
+    for page in PAGES:
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        at.session_state["logged_in"] = True
+        at.session_state["current_user"] = "admin"
+
+        start = time.perf_counter()
+        at.run()
+        at.sidebar.selectbox[0].set_value(page)
+        at.run()
+        first = time.perf_counter() - start
+        _check(at, page)
+
+        wall, peak = measure(at.run, repeat=repeat)
+        _check(at, page)
+        report(out, f"page_{page.lower().replace(' ', '_')}", "page", rows, wall, peak,
+               first_run_s=round(first, 6))
+
+
+def _check(at, page):
+    if at.exception:
+        raise RuntimeError(f"Halaman {page} gagal: {at.exception[0].value}")
+
+
+# =======================================================================================
+# MAIN
+# =======================================================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="jumlah baris ledger (mis. 1000 10000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="file JSON lines (default: stdout)")
+    parser.add_argument("--skip-pages", action="store_true", help="hanya fungsi data")
+    parser.add_argument("--timeout", type=float, default=600, help="batas waktu per rerun halaman (detik)")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for rows in args.sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = os.path.join(tmp, "bench.db")
+                store = keuangan_store.LedgerStore(db_path)
+                store.init_chart(keuangan_store.DEFAULT_KATEGORI_MAP, keuangan_store.DEFAULT_KATEGORI_LIST)
+                fill_store(store, generate_ledger(rows))
+
+                bench_data(out, store, rows, args.repeat)
+                if not args.skip_pages:
+                    # Aplikasi membaca keuangan_store.DB_PATH di setiap run skrip
+                    keuangan_store.DB_PATH = db_path
+                    bench_pages(out, rows, args.repeat, args.timeout)
+                store.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import pandas as pd
+
+ROLLUP_COLUMNS = ["Kategori", "Akun", "Induk", "Tingkat", "Debit", "Kredit", "Saldo"]
+
+
+# =======================================================================================
+# CHART OF ACCOUNTS
+# =======================================================================================
+class ChartOfAccounts:
+    """Daftar akun terurut (boleh bersarang) beserta pemakaian dan subtotal setiap akun.
+
+    `kategori_map` (akun -> kategori) adalah dict biasa: urutan penambahannya sekaligus
+    urutan dropdown, dan cek atau ambil kategori sebuah akun O(1). Jumlah pemakaian dan
+    subtotal diperbarui lewat protokol index di keuangan_index (add/add_many/remove
+    dipanggil Ledger di setiap mutasi), jadi cek "akun sudah dipakai" maupun saldo
+    gabungan sebuah akun induk tidak memindai transaksi.
+
+    Sub-akun menunjuk induknya lewat `parents`. `subtotals` menyimpan total akun beserta
+    semua sub-akunnya: satu transaksi menambah subtotal akunnya dan setiap induk di atasnya
+    (O(kedalaman)), sehingga saldo di tingkat mana pun tinggal dibaca.
+    """
+
+    def __init__(self, kategori_map=(), categories=(), parents=()):
+        self.kategori_map = dict(kategori_map)
+        self.categories = list(dict.fromkeys(categories))
+        self.usage = {}        # akun -> jumlah transaksi (akun tanpa transaksi tidak ada)
+        self.subtotals = {}    # akun -> [debit, kredit, jumlah transaksi] termasuk sub-akun
+        self.parents = {}      # sub-akun -> induk
+        self.children = {}     # induk -> [sub-akun], urut chart
+        # Cache (names(), akun -> posisi) sebagai satu tuple: UI membacanya tanpa lock
+        # ledger, jadi keduanya diganti sekaligus dan tidak pernah terlihat setengah jadi
+        self._order = None     # dibangun ulang setelah akun dihapus
+        self._tree = None      # cache tree(); dibangun ulang setelah hierarki berubah
+        for akun, induk in dict(parents).items():
+            self._link(akun, induk)
+
+    @classmethod
+    def from_frame(cls, frame, kategori_map=(), categories=(), parents=()):
+        chart = cls(kategori_map, categories, parents)
+        if frame.empty:
+            return chart
+        grouped = frame.groupby("Akun", observed=True).agg(
+            Debit=("Debit", "sum"), Kredit=("Kredit", "sum"), n=("Debit", "size")
+        )
+        for akun, debit, kredit, n in zip(
+            grouped.index, grouped["Debit"], grouped["Kredit"], grouped["n"]
+        ):
+            chart.usage[akun] = int(n)
+            chart._post(akun, int(debit), int(kredit), int(n))
+        return chart
+
+    # -----------------------------------------------------------------------------------
+    # Protokol index (dipanggil Ledger)
+    # -----------------------------------------------------------------------------------
+    def add(self, row_id, row):
+        akun = row["Akun"]
+        self.usage[akun] = self.usage.get(akun, 0) + 1
+        self._post(akun, int(row["Debit"]), int(row["Kredit"]), 1)
+
+    def add_many(self, items):
+        for row_id, row in items:
+            self.add(row_id, row)
+
+    def remove(self, row_id, row):
+        akun = row["Akun"]
+        n = self.usage[akun] - 1
+        if n:
+            self.usage[akun] = n
+        else:
+            del self.usage[akun]
+        self._post(akun, -int(row["Debit"]), -int(row["Kredit"]), -1)
+
+    def _post(self, akun, debit, kredit, n, subtotals=None):
+        """Tambahkan total ke `akun` dan semua induknya."""
+        subtotals = self.subtotals if subtotals is None else subtotals
+        for node in self.lineage(akun):
+            entry = subtotals.setdefault(node, [0, 0, 0])
+            entry[0] += debit
+            entry[1] += kredit
+            entry[2] += n
+            if entry[2] == 0:
+                del subtotals[node]
+
+    # -----------------------------------------------------------------------------------
+    # Baca
+    # -----------------------------------------------------------------------------------
+    def __contains__(self, akun):
+        return akun in self.kategori_map
+
+    def __len__(self):
+        return len(self.kategori_map)
+
+    def kategori(self, akun, default="Lainnya"):
+        return self.kategori_map.get(akun, default)
+
+    def is_used(self, akun):
+        return akun in self.usage
+
+    def names(self):
+        """Nama akun urut penambahan, untuk opsi dropdown.
+
+        List yang sama dikembalikan selama tidak ada akun yang dihapus; akun baru cukup
+        di-append, jadi jangan diubah oleh pemanggil.
+        """
+        return self._ordering()[0]
+
+    def position(self, akun):
+        """Posisi `akun` di `names()` (mis. index selectbox); KeyError jika tidak terdaftar."""
+        return self._ordering()[1][akun]
+
+    def _ordering(self):
+        order = self._order
+        if order is None:
+            names = list(self.kategori_map)
+            order = (names, {akun: pos for pos, akun in enumerate(names)})
+            self._order = order
+        return order
+
+    # -----------------------------------------------------------------------------------
+    # Hierarki
+    # -----------------------------------------------------------------------------------
+    def lineage(self, akun):
+        """`akun`, lalu induknya, induk dari induknya, dst. sampai akun tingkat teratas."""
+        while akun is not None:
+            yield akun
+            akun = self.parents.get(akun)
+
+    def depth(self, akun):
+        return sum(1 for _ in self.lineage(akun)) - 1
+
+    def subtree(self, akun):
+        """`akun` beserta semua sub-akunnya (urut pohon)."""
+        result, stack = [], [akun]
+        while stack:
+            node = stack.pop()
+            result.append(node)
+            stack.extend(reversed(self.children.get(node, [])))
+        return result
+
+    @property
+    def nested(self):
+        """True jika ada akun yang punya sub-akun."""
+        return bool(self.children)
+
+    def tree(self):
+        """(akun, tingkat) untuk semua akun, urut pohon: induk lalu sub-akunnya."""
+        tree = self._tree
+        if tree is None:
+            tree = [
+                (akun, self.depth(akun))
+                for root in self.names() if root not in self.parents
+                for akun in self.subtree(root)
+            ]
+            self._tree = tree
+        return tree
+
+    def subtotal(self, akun):
+        """(debit, kredit) `akun` beserta semua sub-akunnya, dari subtotal yang tersimpan."""
+        debit, kredit, _ = self.subtotals.get(akun, (0, 0, 0))
+        return debit, kredit
+
+    def rollup(self, table=None):
+        """Tabel saldo per akun menurut pohon akun (ROLLUP_COLUMNS), urut pohon.
+
+        Tanpa `table` diambil dari subtotal yang tersimpan. Dengan `table` (saldo per
+        (Kategori, Akun), mis. `Ledger.balance_table(as_of)`) subtotal dijumlahkan dari
+        tabel itu, yang ukurannya sebanding jumlah akun, bukan jumlah transaksi.
+        """
+        subtotals = self.subtotals
+        if table is not None:
+            subtotals = {}
+            for akun, debit, kredit in zip(table["Akun"], table["Debit"], table["Kredit"]):
+                self._post(akun, int(debit), int(kredit), 1, subtotals)
+
+        rows = []
+        for akun, tingkat in self.tree():
+            entry = subtotals.get(akun)
+            if entry is not None:
+                debit, kredit, _ = entry
+                rows.append((self.kategori(akun), akun, self.parents.get(akun), tingkat,
+                             debit, kredit, debit - kredit))
+        # Akun yang dipakai transaksi tetapi sudah tidak ada di chart
+        for akun, (debit, kredit, _) in subtotals.items():
+            if akun not in self.kategori_map:
+                rows.append(("Lainnya", akun, None, 0, debit, kredit, debit - kredit))
+        return pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+
+    # -----------------------------------------------------------------------------------
+    # Ubah chart (penyimpanan ke database diurus Ledger)
+    # -----------------------------------------------------------------------------------
+    def add_account(self, akun, kategori, induk=None):
+        if akun in self.kategori_map:
+            raise ValueError("Akun sudah ada.")
+        self.check_parent(akun, induk, kategori)
+        self.kategori_map[akun] = kategori
+        order = self._order
+        if order is not None:
+            names, positions = order
+            positions[akun] = len(names)
+            names.append(akun)
+        if induk is not None:
+            self._link(akun, induk)
+        self._tree = None
+        if kategori not in self.categories:
+            self.categories.append(kategori)
+
+    def remove_account(self, akun):
+        self.check_remove(akun)
+        del self.kategori_map[akun]
+        self._unlink(akun)
+        # Posisi akun sesudahnya bergeser; dibangun ulang sekali saat dibaca lagi
+        self._order = self._tree = None
+
+    def set_parent(self, akun, induk):
+        """Pindahkan `akun` (beserta sub-akunnya) ke bawah `induk` (None = tingkat teratas)."""
+        self.check_parent(akun, induk, self.kategori(akun))
+        # Subtotal akun sudah mencakup sub-akunnya: cukup dipindah dari rantai induk lama
+        # ke rantai induk baru
+        entry = self.subtotals.get(akun)
+        old = self.parents.get(akun)
+        if entry is not None and old is not None:
+            self._post(old, -entry[0], -entry[1], -entry[2])
+        self._unlink(akun)
+        if induk is not None:
+            self._link(akun, induk)
+            if entry is not None:
+                self._post(induk, entry[0], entry[1], entry[2])
+        self._tree = None
+
+    def check_remove(self, akun):
+        """ValueError jika `akun` belum boleh dihapus (masih dipakai atau punya sub-akun)."""
+        if self.is_used(akun):
+            raise ValueError("Akun tidak dapat dihapus karena sudah digunakan di transaksi.")
+        if akun in self.children:
+            raise ValueError("Akun tidak dapat dihapus karena masih punya sub-akun.")
+
+    def check_parent(self, akun, induk, kategori):
+        """ValueError jika `induk` tidak bisa menjadi induk `akun`."""
+        if induk is None:
+            return
+        if induk not in self.kategori_map:
+            raise ValueError(f"Akun induk '{induk}' tidak ada di chart of accounts.")
+        if akun in self.lineage(induk):
+            raise ValueError(
+                "Akun tidak bisa menjadi sub-akun dari dirinya sendiri atau sub-akunnya."
+            )
+        if self.kategori(induk) != kategori:
+            raise ValueError("Kategori sub-akun harus sama dengan kategori akun induknya.")
+
+    def _link(self, akun, induk):
+        self.parents[akun] = induk
+        siblings = self.children.setdefault(induk, [])
+        siblings.append(akun)
+        # Sub-akun selalu tampil menurut urutan chart, bukan urutan dipindahkan
+        positions = self._ordering()[1]
+        siblings.sort(key=lambda a: positions.get(a, len(positions)))
+
+    def _unlink(self, akun):
+        induk = self.parents.pop(akun, None)
+        if induk is not None:
+            siblings = self.children[induk]
+            siblings.remove(akun)
+            if not siblings:
+                del self.children[induk]
+
+    def add_category(self, kategori):
+        if kategori in self.categories:
+            raise ValueError("Kategori sudah ada.")
+        self.categories.append(kategori)
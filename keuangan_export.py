@@ -0,0 +1,588 @@
+import atexit
+import csv
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from datetime import date
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from keuangan_index import aggregate_balances
+from keuangan_laporan import (
+    BEBAN, NERACA_KATEGORI, PENDAPATAN, income_statement, net_income, trial_balance,
+)
+from keuangan_profiling import profiled
+from keuangan_store import COLUMNS
+
+# Di atas jumlah baris ini export ditulis per potongan langsung dari SQLite ke file
+# sementara, tanpa membangun DataFrame dan file lengkap di memori bersamaan.
+STREAM_EXPORT_ROWS = 100_000
+CHUNK_ROWS = 10_000
+
+# Fungsi export besar menerima `progress(fraksi)` yang dipanggil setiap potongan selesai.
+# Callback boleh melempar exception untuk membatalkan export (lihat keuangan_jobs).
+
+
+def _report_progress(progress, done, total):
+    if progress is not None and total:
+        progress(min(done / total, 1.0))
+
+
+# =======================================================================================
+# EXPORT DARI DATAFRAME (LEDGER KECIL)
+# =======================================================================================
+# Ditulis per potongan CHUNK_ROWS baris agar progress (dan pembatalan job) tetap berjalan
+def excel_bytes(frame, progress=None):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter', datetime_format="yyyy-mm-dd") as writer:
+        for start in range(0, max(len(frame), 1), CHUNK_ROWS):
+            frame.iloc[start:start + CHUNK_ROWS].to_excel(
+                writer, index=False, header=start == 0, startrow=start + (start > 0)
+            )
+            _report_progress(progress, start + CHUNK_ROWS, len(frame))
+    return output.getvalue()
+
+def csv_bytes(frame, progress=None):
+    output = BytesIO()
+    for start in range(0, max(len(frame), 1), CHUNK_ROWS):
+        chunk = frame.iloc[start:start + CHUNK_ROWS]
+        output.write(chunk.to_csv(index=False, header=start == 0).encode("utf-8"))
+        _report_progress(progress, start + CHUNK_ROWS, len(frame))
+    return output.getvalue()
+
+
+# =======================================================================================
+# EXPORT KOLOMNAR (PARQUET / ARROW IPC)
+# =======================================================================================
+# Tipe kolom ikut tersimpan: Tanggal tetap timestamp, Akun/Kategori tetap dictionary
+# (categorical), Debit/Kredit tetap int64. Semuanya dibangun dari DataFrame ledger.
+def arrow_table(frame):
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(frame[COLUMNS], preserve_index=False)
+
+def write_parquet(frame, path):
+    import pyarrow.parquet as pq
+
+    pq.write_table(arrow_table(frame), path, compression="zstd")
+
+def write_arrow(frame, path):
+    import pyarrow as pa
+
+    # File IPC tanpa kompresi: pembaca bisa memory-map file ini tanpa menyalin buffer kolom
+    table = arrow_table(frame)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=CHUNK_ROWS * 10)
+
+def parquet_bytes(frame):
+    output = BytesIO()
+    write_parquet(frame, output)
+    return output.getvalue()
+
+def arrow_bytes(frame):
+    import pyarrow as pa
+
+    table = arrow_table(frame)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=CHUNK_ROWS * 10)
+    return sink.getvalue().to_pybytes()
+
+
+# =======================================================================================
+# EXPORT STREAMING (LEDGER BESAR)
+# =======================================================================================
+def stream_csv(store, path, chunk_rows=CHUNK_ROWS, progress=None, total_rows=None):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        done = 0
+        for rows in store.iter_chunks(chunk_rows):
+            writer.writerows(rows)
+            done += len(rows)
+            _report_progress(progress, done, total_rows)
+
+def stream_excel(store, path, chunk_rows=CHUNK_ROWS, progress=None, total_rows=None):
+    import xlsxwriter
+
+    # constant_memory: setiap baris langsung ditulis ke disk begitu baris berikutnya dimulai
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        sheet = workbook.add_worksheet("Sheet1")
+        header_fmt = workbook.add_format({"bold": True, "border": 1})
+        date_fmt = workbook.add_format({"num_format": "yyyy-mm-dd"})
+        sheet.write_row(0, 0, COLUMNS, header_fmt)
+
+        r = 1
+        for rows in store.iter_chunks(chunk_rows):
+            for tanggal, deskripsi, akun, kategori, debit, kredit in rows:
+                sheet.write_datetime(r, 0, date.fromisoformat(tanggal), date_fmt)
+                sheet.write_string(r, 1, deskripsi)
+                sheet.write_string(r, 2, akun)
+                sheet.write_string(r, 3, kategori)
+                sheet.write_number(r, 4, debit)
+                sheet.write_number(r, 5, kredit)
+                r += 1
+            _report_progress(progress, r - 1, total_rows)
+    finally:
+        workbook.close()
+
+
+# =======================================================================================
+# WORKBOOK LAPORAN LENGKAP (NERACA, LABA RUGI, NERACA SALDO, BUKU BESAR, JURNAL)
+# =======================================================================================
+_EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+LEDGER_COLUMNS = ["Tanggal", "Deskripsi", "Debit", "Kredit", "Saldo"]
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def write_report(ledger, target, chunk_rows=CHUNK_ROWS, progress=None):
+    """Tulis workbook laporan lengkap ke `target` (path atau BytesIO).
+
+    Semua sheet dibentuk dari satu snapshot `ledger.frame`. Buku besar ditulis mengikuti
+    urutan (akun, tanggal, id) hasil lexsort: baris diambil per potongan `chunk_rows` lewat
+    urutan itu dan saldo berjalan diteruskan antar potongan, jadi tidak ada salinan terurut
+    dari seluruh ledger. Jurnal ditulis per potongan langsung dari snapshot (urut id).
+    Dengan constant_memory setiap baris langsung ditulis ke disk; memori tambahan adalah
+    satu potongan ditambah array urutan, kode akun, dan mutasi (sekitar 17 byte per baris).
+    """
+    import xlsxwriter
+
+    frame = ledger.frame
+    # Akun diurutkan menurut kode kategori = urutan chart of accounts
+    codes = frame["Akun"].cat.codes.to_numpy()
+    order = np.lexsort((frame.index.to_numpy(), frame["Tanggal"].to_numpy(), codes))
+    mutasi = (frame["Debit"] - frame["Kredit"]).to_numpy()
+    balances = aggregate_balances(frame)
+
+    # Setiap transaksi ditulis dua kali: di sheet buku besar akunnya dan di jurnal
+    written = 0
+
+    def on_rows(n):
+        nonlocal written
+        written += n
+        _report_progress(progress, written, 2 * len(frame))
+
+    workbook = xlsxwriter.Workbook(target, {"constant_memory": True})
+    try:
+        fmt = _report_formats(workbook)
+        used = set()
+
+        _write_neraca(workbook.add_worksheet(_sheet_name("Neraca", used)), balances, fmt)
+        _write_income_statement(workbook.add_worksheet(_sheet_name("Laba Rugi", used)), balances, fmt)
+        _write_trial_balance(workbook.add_worksheet(_sheet_name("Neraca Saldo", used)), balances, fmt)
+
+        # Satu sheet per akun
+        categories = frame["Akun"].cat.categories
+        for code, start, end in _code_parts(codes[order]):
+            sheet = workbook.add_worksheet(_sheet_name(f"BB {categories[code]}", used))
+            _write_chunks(sheet, LEDGER_COLUMNS, _ledger_chunks(
+                frame, order[start:end], mutasi, fmt, chunk_rows
+            ), fmt, on_rows)
+
+        sheet = workbook.add_worksheet(_sheet_name("Jurnal", used))
+        _write_chunks(sheet, COLUMNS, (
+            _journal_columns(frame.iloc[lo:lo + chunk_rows], fmt)
+            for lo in range(0, len(frame), chunk_rows)
+        ), fmt, on_rows)
+    finally:
+        workbook.close()
+
+
+def report_bytes(ledger, progress=None):
+    output = BytesIO()
+    write_report(ledger, output, progress=progress)
+    return output.getvalue()
+
+
+def _report_formats(workbook):
+    return {
+        "header": workbook.add_format({"bold": True, "border": 1}),
+        "date": workbook.add_format({"num_format": "yyyy-mm-dd"}),
+        "money": workbook.add_format({"num_format": "#,##0"}),
+        "total": workbook.add_format({"bold": True, "num_format": "#,##0", "top": 1}),
+        "bold": workbook.add_format({"bold": True, "top": 1}),
+        "text": None,
+    }
+
+
+def _code_parts(codes):
+    """(kode, awal, akhir) untuk setiap blok kode berurutan di array `codes`."""
+    # Batas blok dicari sekali dari kode kategori, bukan lewat groupby
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else []
+    ends = list(starts[1:]) + [len(codes)]
+    return [(codes[start], int(start), int(end)) for start, end in zip(starts, ends)]
+
+
+def _account_parts(akun):
+    """(akun, awal, akhir) untuk setiap blok akun berurutan di Series `akun` (categorical)."""
+    categories = akun.cat.categories
+    return [
+        (categories[code], start, end)
+        for code, start, end in _code_parts(akun.cat.codes.to_numpy())
+    ]
+
+
+def _ledger_columns(rows, saldo, fmt):
+    """Kolom sheet buku besar (LEDGER_COLUMNS) untuk `_write_table`."""
+    return [
+        (_excel_dates(rows["Tanggal"]), "number", fmt["date"]),
+        (rows["Deskripsi"].to_numpy(), "string", fmt["text"]),
+        (rows["Debit"].to_numpy(), "number", fmt["money"]),
+        (rows["Kredit"].to_numpy(), "number", fmt["money"]),
+        (np.asarray(saldo), "number", fmt["money"]),
+    ]
+
+
+def _ledger_chunks(frame, positions, mutasi, fmt, chunk_rows):
+    """Kolom buku besar satu akun per potongan; `positions` = posisi baris terurut di `frame`."""
+    saldo = 0
+    for lo in range(0, len(positions), chunk_rows):
+        part = positions[lo:lo + chunk_rows]
+        # Saldo berjalan dilanjutkan dari akhir potongan sebelumnya
+        running = saldo + np.cumsum(mutasi[part])
+        saldo = running[-1]
+        yield _ledger_columns(frame.take(part), running, fmt)
+
+
+def _journal_columns(rows, fmt):
+    """Kolom sheet jurnal (COLUMNS) untuk `_write_chunks`."""
+    return [
+        (_excel_dates(rows["Tanggal"]), "number", fmt["date"]),
+        (rows["Deskripsi"].to_numpy(), "string", fmt["text"]),
+        (rows["Akun"].astype(str).to_numpy(), "string", fmt["text"]),
+        (rows["Kategori"].astype(str).to_numpy(), "string", fmt["text"]),
+        (rows["Debit"].to_numpy(), "number", fmt["money"]),
+        (rows["Kredit"].to_numpy(), "number", fmt["money"]),
+    ]
+
+
+def _write_table(sheet, header, columns, fmt, chunk_rows=CHUNK_ROWS, on_rows=None):
+    """Tulis tabel per baris; `columns` berisi (nilai, "string"/"number", format) per kolom.
+
+    `on_rows(n)` dipanggil setelah setiap potongan n baris ditulis.
+    """
+    n_rows = len(columns[0][0])
+    _write_chunks(sheet, header, (
+        [(values[lo:lo + chunk_rows], kind, cell_fmt) for values, kind, cell_fmt in columns]
+        for lo in range(0, n_rows, chunk_rows)
+    ), fmt, on_rows)
+
+
+def _write_chunks(sheet, header, chunks, fmt, on_rows=None):
+    """Seperti `_write_table`, tetapi kolom datang sebagai iterable potongan.
+
+    Potongan dibentuk oleh pemanggil (mis. lewat generator) sehingga hanya satu potongan
+    yang hidup di memori pada satu waktu.
+    """
+    sheet.write_row(0, 0, header, fmt["header"])
+    sheet.set_column(0, len(header) - 1, 14)
+    r = 1
+    for columns in chunks:
+        writers = [
+            (sheet.write_string if kind == "string" else sheet.write_number, cell_fmt)
+            for _, kind, cell_fmt in columns
+        ]
+        chunk = [values.tolist() for values, _, _ in columns]
+        for values in zip(*chunk):
+            for c, (value, (write, cell_fmt)) in enumerate(zip(values, writers)):
+                write(r, c, value, cell_fmt)
+            r += 1
+        if on_rows is not None:
+            on_rows(len(chunk[0]))
+
+
+def _write_grouped(sheet, rows, value_column, groups, fmt, r=1):
+    """Baris (Kategori, Akun, nilai) per kelompok kategori, masing-masing dengan subtotal."""
+    for nama in groups:
+        group = rows[rows["Kategori"] == nama]
+        for akun, value in zip(group["Akun"].tolist(), group[value_column].tolist()):
+            sheet.write_string(r, 0, nama)
+            sheet.write_string(r, 1, akun)
+            sheet.write_number(r, 2, value, fmt["money"])
+            r += 1
+        r = _write_total(sheet, r, f"Total {nama}", int(group[value_column].sum()), fmt) + 1
+    return r
+
+
+def _write_total(sheet, r, label, value, fmt):
+    sheet.write_string(r, 0, label, fmt["bold"])
+    sheet.write_blank(r, 1, None, fmt["bold"])
+    sheet.write_number(r, 2, value, fmt["total"])
+    return r + 1
+
+
+def _write_neraca(sheet, balances, fmt):
+    sheet.write_row(0, 0, ["Kategori", "Akun", "Saldo"], fmt["header"])
+    sheet.set_column(0, 2, 18)
+    # Akun nominal tidak dirinci di neraca; hasil bersihnya tampil sebagai laba berjalan
+    r = _write_grouped(sheet, balances, "Saldo", NERACA_KATEGORI, fmt)
+    _write_total(sheet, r, "Laba (Rugi) Berjalan", net_income(balances), fmt)
+
+
+def _write_income_statement(sheet, balances, fmt):
+    sheet.write_row(0, 0, ["Kategori", "Akun", "Jumlah"], fmt["header"])
+    sheet.set_column(0, 2, 18)
+    rows = income_statement(balances)
+    r = _write_grouped(sheet, rows, "Jumlah", [PENDAPATAN, BEBAN], fmt)
+    _write_total(sheet, r, "Laba (Rugi) Bersih", net_income(balances), fmt)
+
+
+def _write_trial_balance(sheet, balances, fmt):
+    table = trial_balance(balances)
+    sheet.write_row(0, 0, list(table.columns), fmt["header"])
+    sheet.set_column(0, len(table.columns) - 1, 16)
+    r = 1
+    for row in zip(*(table[c].tolist() for c in table.columns)):
+        sheet.write_string(r, 0, row[0])
+        sheet.write_string(r, 1, row[1])
+        for c in range(2, 6):
+            sheet.write_number(r, c, row[c], fmt["money"])
+        r += 1
+    sheet.write_string(r, 0, "Total", fmt["bold"])
+    sheet.write_blank(r, 1, None, fmt["bold"])
+    for c, column in enumerate(table.columns[2:], start=2):
+        sheet.write_number(r, c, int(table[column].sum()), fmt["total"])
+
+
+def _excel_dates(values):
+    # Nomor seri tanggal Excel; jauh lebih murah daripada write_datetime per sel
+    return ((values - _EXCEL_EPOCH) // pd.Timedelta(days=1)).to_numpy()
+
+
+def _sheet_name(name, used):
+    """Nama sheet valid (maks 31 karakter, tanpa []:*?/\\) dan unik di workbook."""
+    base = _INVALID_SHEET_CHARS.sub("_", name)[:31]
+    candidate, n = base, 2
+    while candidate.lower() in used:
+        suffix = f" ({n})"
+        candidate = base[:31 - len(suffix)] + suffix
+        n += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+# =======================================================================================
+# BUKU BESAR SEMUA AKUN (ZIP, SATU WORKBOOK PER AKUN)
+# =======================================================================================
+# Mulai jumlah baris ini workbook per akun ditulis paralel di process pool
+PARALLEL_LEDGER_ROWS = 200_000
+# Akun dibagi menjadi sekitar sekian tugas per worker agar beban tetap rata
+TASKS_PER_WORKER = 4
+# Jumlah proses worker di pool (satu per core)
+POOL_WORKERS = os.cpu_count() or 1
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _process_pool():
+    """Process pool bersama, dibuat saat pertama dipakai (None jika hanya ada satu core)."""
+    global _pool
+    if POOL_WORKERS < 2:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # spawn, bukan fork: proses server Streamlit punya banyak thread dan lock
+            _pool = ProcessPoolExecutor(
+                POOL_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def write_account_ledgers(ledger, target, chunk_rows=CHUNK_ROWS, progress=None):
+    """Tulis ZIP berisi satu workbook buku besar (dengan saldo berjalan) per akun.
+
+    Baris semua akun diambil sekali, sudah terpisah dan terurut per akun (lihat
+    Ledger.all_account_ledgers), lalu ditulis sekali ke file Arrow IPC sementara. Untuk
+    ledger besar setiap worker me-memory-map file itu dan hanya membaca potongan akunnya,
+    jadi kolom tidak disalin ke setiap proses.
+    """
+    import pyarrow as pa
+
+    frame = ledger.all_account_ledgers(open_period=False)
+    parts = _account_parts(frame["Akun"])
+    used = set()
+    names = [_sheet_name(f"BB {akun}", used) + ".xlsx" for akun, _, _ in parts]
+
+    tmp_dir = tempfile.mkdtemp(prefix="keuangan_bb_")
+    try:
+        ipc_path = os.path.join(tmp_dir, "bukubesar.arrow")
+        table = pa.Table.from_pandas(frame[LEDGER_COLUMNS], preserve_index=False)
+        with pa.OSFile(ipc_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        del table
+
+        books = [(name, akun, start, end) for name, (akun, start, end) in zip(names, parts)]
+        pool = _process_pool() if len(frame) >= PARALLEL_LEDGER_ROWS else None
+        if pool is None:
+            done = 0
+            for book in books:
+                done += _write_account_books(ipc_path, [book], chunk_rows)
+                _report_progress(progress, done, len(frame))
+        else:
+            tasks = _split_tasks(books, POOL_WORKERS * TASKS_PER_WORKER)
+            futures = [pool.submit(_write_account_books, ipc_path, task, chunk_rows) for task in tasks]
+            try:
+                done = 0
+                for future in as_completed(futures):
+                    done += future.result()
+                    _report_progress(progress, done, len(frame))
+            except BaseException:
+                # Dibatalkan atau gagal: hentikan tugas yang belum mulai sebelum folder dihapus
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                raise
+
+        with zipfile.ZipFile(target, "w", zipfile.ZIP_STORED) as archive:  # xlsx sudah terkompresi
+            for name in names:
+                archive.write(os.path.join(tmp_dir, name), name)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def account_ledgers_bytes(ledger, progress=None):
+    output = BytesIO()
+    write_account_ledgers(ledger, output, progress=progress)
+    return output.getvalue()
+
+
+def _split_tasks(books, n_tasks):
+    """Kelompokkan akun berurutan menjadi kira-kira `n_tasks` tugas dengan jumlah baris rata."""
+    target = max(1, sum(end - start for _, _, start, end in books) / n_tasks)
+    tasks, current, size = [], [], 0
+    for book in books:
+        current.append(book)
+        size += book[3] - book[2]
+        if size >= target:
+            tasks.append(current)
+            current, size = [], 0
+    if current:
+        tasks.append(current)
+    return tasks
+
+
+def _write_account_books(ipc_path, books, chunk_rows=CHUNK_ROWS):
+    """Tulis workbook `books` [(nama file, akun, awal, akhir)] ke folder `ipc_path`.
+
+    Berjalan di proses worker; kembalikan jumlah baris yang ditulis.
+    """
+    import pyarrow as pa
+    import xlsxwriter
+
+    out_dir = os.path.dirname(ipc_path)
+    with pa.memory_map(ipc_path) as source:
+        table = pa.ipc.open_file(source).read_all()  # tanpa salin: buffer menunjuk ke mmap
+        for name, akun, start, end in books:
+            rows = table.slice(start, end - start).to_pandas()
+            workbook = xlsxwriter.Workbook(os.path.join(out_dir, name), {"constant_memory": True})
+            try:
+                fmt = _report_formats(workbook)
+                sheet = workbook.add_worksheet(_sheet_name(f"BB {akun}", set()))
+                _write_table(sheet, LEDGER_COLUMNS, _ledger_columns(rows, rows["Saldo"], fmt),
+                             fmt, chunk_rows)
+            finally:
+                workbook.close()
+    return sum(end - start for _, _, start, end in books)
+
+
+# =======================================================================================
+# EXPORT TER-CACHE PER VERSI LEDGER
+# =======================================================================================
+_export_dir = None
+_export_dir_lock = threading.Lock()
+
+def _new_export_file(ledger, ext):
+    """Buat file kosong bernama unik untuk satu build export, di folder milik proses ini.
+
+    Folder itu dihapus saat proses berakhir, jadi file export tidak tertinggal di /tmp.
+    """
+    global _export_dir
+    with _export_dir_lock:
+        if _export_dir is None:
+            _export_dir = tempfile.mkdtemp(prefix="keuangan_export_")
+            atexit.register(shutil.rmtree, _export_dir, ignore_errors=True)
+    fd, path = tempfile.mkstemp(
+        prefix=f"keuangan_{ledger.version}_", suffix=f".{ext}", dir=_export_dir
+    )
+    os.close(fd)
+    return path
+
+def _remove_export(path):
+    # File versi lama; di Windows file yang masih dibuka unduhan gagal dihapus dan baru
+    # ikut terhapus bersama folder saat proses berakhir
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _export(ledger, ext, to_bytes, to_file, progress=None):
+    # Dibangun paling banyak sekali per versi ledger, berapa kali pun halaman di-rerun.
+    # Kedua jalur melaporkan progress, jadi job export kecil pun bisa dibatalkan.
+    if len(ledger) < STREAM_EXPORT_ROWS:
+        return ledger.cached(f"export_{ext}", lambda: to_bytes(ledger.frame, progress))
+
+    def build():
+        # Setiap build menulis ke file barunya sendiri dan tidak pernah menimpa file lain:
+        # unduhan atau job yang masih membuka file versi lama tidak menghalangi export baru
+        # (di Windows file yang sedang dibuka tidak bisa ditimpa dengan os.replace)
+        path = _new_export_file(ledger, ext)
+        try:
+            to_file(ledger, path, progress)
+        except BaseException:
+            os.remove(path)  # gagal atau dibatalkan: jangan tinggalkan file setengah jadi
+            raise
+        return path
+
+    while True:
+        path = ledger.cached(f"export_{ext}_file", build, discard=_remove_export)
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            # Sesi lain mengubah ledger dan menghapus file versi ini sebelum sempat dibuka:
+            # ambil (atau bangun) export untuk versi sekarang
+            continue
+
+@profiled()
+def export_excel(ledger, progress=None):
+    return _export(ledger, "xlsx", excel_bytes, lambda ledger, path, progress: stream_excel(
+        ledger.store, path, progress=progress, total_rows=len(ledger)
+    ), progress)
+
+@profiled()
+def export_csv(ledger, progress=None):
+    return _export(ledger, "csv", csv_bytes, lambda ledger, path, progress: stream_csv(
+        ledger.store, path, progress=progress, total_rows=len(ledger)
+    ), progress)
+
+@profiled()
+def export_report(ledger, progress=None):
+    return _export(ledger, "laporan.xlsx", lambda _frame, progress: report_bytes(ledger, progress),
+                   lambda ledger, path, progress: write_report(ledger, path, progress=progress),
+                   progress)
+
+@profiled()
+def export_parquet(ledger, progress=None):
+    # Parquet/Arrow ditulis per kolom sekaligus (cepat), tanpa progress per potongan
+    return _export(ledger, "parquet", lambda frame, _progress: parquet_bytes(frame),
+                   lambda ledger, path, _progress: write_parquet(ledger.frame, path), progress)
+
+@profiled()
+def export_arrow(ledger, progress=None):
+    return _export(ledger, "arrow", lambda frame, _progress: arrow_bytes(frame),
+                   lambda ledger, path, _progress: write_arrow(ledger.frame, path), progress)
+
+@profiled()
+def export_account_ledgers(ledger, progress=None):
+    return _export(ledger, "bukubesar.zip",
+                   lambda _frame, progress: account_ledgers_bytes(ledger, progress),
+                   lambda ledger, path, progress: write_account_ledgers(ledger, path, progress=progress),
+                   progress)
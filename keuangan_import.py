@@ -0,0 +1,205 @@
+import os
+
+import pandas as pd
+
+from keuangan_profiling import profiled
+from keuangan_store import COLUMNS
+
+IMPORT_CHUNK_ROWS = 5_000
+
+# Kolom yang wajib ada di file; Deskripsi boleh kosong, Kategori selalu diambil dari chart of accounts
+REQUIRED_COLUMNS = ["Tanggal", "Akun", "Debit", "Kredit"]
+ERROR_COLUMNS = ["Baris", "Kesalahan"]
+
+
+# =======================================================================================
+# PEMBACAAN FILE PER POTONGAN
+# =======================================================================================
+def read_chunks(file, file_name, chunk_rows=IMPORT_CHUNK_ROWS):
+    """Baca file CSV/XLSX/Parquet/Arrow sebagai rangkaian DataFrame maksimal `chunk_rows` baris.
+
+    Index setiap potongan adalah nomor baris di file (baris 1 = header), jadi laporan
+    kesalahan tetap menunjuk baris yang benar walaupun file berisi baris kosong.
+    """
+    name = file_name.lower()
+    if name.endswith(".csv"):
+        yield from _read_csv_chunks(file, chunk_rows)
+    elif name.endswith(".xlsx"):
+        yield from _read_xlsx_chunks(file, chunk_rows)
+    elif name.endswith(".parquet"):
+        yield from _numbered(_read_parquet_chunks(file, chunk_rows))
+    elif name.endswith((".arrow", ".feather")):
+        yield from _numbered(_read_arrow_chunks(file, chunk_rows))
+    else:
+        raise ValueError("Format file tidak didukung (gunakan .csv, .xlsx, .parquet atau .arrow).")
+
+
+def _numbered(chunks, first_row=2):
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(first_row, first_row + len(chunk))
+        first_row += len(chunk)
+        yield chunk
+
+
+def _read_csv_chunks(file, chunk_rows):
+    # Baris kosong ikut dibaca supaya index tetap sama dengan nomor baris file, lalu dibuang
+    for chunk in pd.read_csv(
+        file, chunksize=chunk_rows, dtype=str, keep_default_na=False, skip_blank_lines=False
+    ):
+        chunk.index += 2
+        chunk = chunk[(chunk.fillna("") != "").any(axis=1)]
+        if not chunk.empty:
+            yield chunk
+
+
+def _read_xlsx_chunks(file, chunk_rows):
+    import openpyxl
+
+    # read_only: baris dibaca bertahap dari file, bukan seluruh workbook dimuat ke memori
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h).strip() if h is not None else "" for h in header]
+
+        # iter_rows juga menghasilkan baris kosong di tengah sheet, jadi urutannya sama
+        # dengan nomor baris sheet
+        batch, numbers = [], []
+        for number, row in enumerate(rows, start=2):
+            if all(v is None for v in row):
+                continue
+            batch.append(row)
+            numbers.append(number)
+            if len(batch) == chunk_rows:
+                yield pd.DataFrame(batch, columns=header, index=numbers)
+                batch, numbers = [], []
+        if batch:
+            yield pd.DataFrame(batch, columns=header, index=numbers)
+    finally:
+        workbook.close()
+
+
+def _read_parquet_chunks(file, chunk_rows):
+    import pyarrow.parquet as pq
+
+    # Tipe kolom (timestamp, int64) dibawa file; dibaca per batch, bukan seluruh file
+    for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def _read_arrow_chunks(file, chunk_rows):
+    import pyarrow as pa
+
+    # Record batch mereferensikan buffer file/upload secara langsung (tanpa salinan);
+    # yang disalin hanya potongan yang sedang diubah ke pandas
+    if isinstance(file, (str, os.PathLike)):
+        source = pa.memory_map(os.fspath(file))
+    elif hasattr(file, "getbuffer"):
+        source = pa.py_buffer(file.getbuffer())
+    else:
+        source = file
+    reader = pa.ipc.open_file(source)
+    for i in range(reader.num_record_batches):
+        batch = reader.get_batch(i)
+        for offset in range(0, batch.num_rows, chunk_rows):
+            yield batch.slice(offset, chunk_rows).to_pandas()
+
+
+# =======================================================================================
+# VALIDASI (VEKTOR)
+# =======================================================================================
+def validate_chunk(chunk, kategori_map, closed_until=None):
+    """Validasi satu potongan sekaligus per kolom.
+
+    Index `chunk` adalah nomor baris file setiap baris (lihat `read_chunks`). Baris
+    bertanggal s.d. `closed_until` (periode yang sudah ditutup) ditolak.
+    Kembalikan (DataFrame baris valid dengan kolom COLUMNS, DataFrame kesalahan).
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+    baris = chunk.index
+
+    tanggal = pd.to_datetime(chunk["Tanggal"], errors="coerce")
+    akun = chunk["Akun"].astype("string").str.strip()
+    debit = _to_amount(chunk["Debit"])
+    kredit = _to_amount(chunk["Kredit"])
+
+    checks = [
+        (tanggal.isna(), "Tanggal tidak valid"),
+        (~akun.isin(list(kategori_map)).fillna(False), "Akun tidak ada di chart of accounts"),
+        (debit.isna(), "Debit harus bilangan bulat"),
+        (kredit.isna(), "Kredit harus bilangan bulat"),
+        (debit < 0, "Debit tidak boleh negatif"),
+        (kredit < 0, "Kredit tidak boleh negatif"),
+    ]
+    if closed_until is not None:
+        checks.append((tanggal.dt.normalize() <= closed_until, "Periode sudah ditutup"))
+
+    invalid = pd.Series(False, index=chunk.index)
+    errors = []
+    for mask, message in checks:
+        mask = mask.fillna(False).astype(bool)
+        if mask.any():
+            invalid |= mask
+            errors.append(pd.DataFrame({"Baris": baris[mask.to_numpy()], "Kesalahan": message}))
+
+    valid = ~invalid
+    deskripsi = chunk["Deskripsi"] if "Deskripsi" in chunk.columns else pd.Series("", index=chunk.index)
+    rows = pd.DataFrame({
+        "Tanggal": tanggal[valid].dt.normalize(),
+        "Deskripsi": deskripsi[valid].fillna("").astype(str),
+        "Akun": akun[valid].astype(str),
+        "Kategori": akun[valid].map(kategori_map).astype(str),
+        "Debit": debit[valid].astype("int64"),
+        "Kredit": kredit[valid].astype("int64"),
+    })[COLUMNS]
+
+    errors = pd.concat(errors, ignore_index=True) if errors else pd.DataFrame(columns=ERROR_COLUMNS)
+    return rows, errors
+
+
+def _to_amount(values):
+    """Sel kosong dianggap 0; teks bukan angka atau pecahan -> NaN (tidak valid)."""
+    if pd.api.types.is_integer_dtype(values):
+        # Kolom bertipe (Parquet/Arrow) tidak perlu diurai ulang dari teks
+        return values
+    text = values.astype("string").str.strip().fillna("").replace("", "0")
+    numbers = pd.to_numeric(text, errors="coerce")
+    return numbers.where(numbers % 1 == 0)
+
+
+# =======================================================================================
+# IMPORT
+# =======================================================================================
+@profiled()
+def import_file(ledger, file, file_name, kategori_map, chunk_rows=IMPORT_CHUNK_ROWS,
+                journal=None):
+    """Baca, validasi, lalu tambahkan semua baris valid ke ledger dalam satu batch.
+
+    Batch itu dicatat ke `journal` (jika diberikan) sebagai satu langkah undo. Melempar
+    PeriodClosed jika periode ditutup sesi lain selama import; tidak ada baris yang masuk.
+    Kembalikan (jumlah baris yang ditambahkan, DataFrame kesalahan per baris).
+    """
+    valid_chunks = []
+    error_chunks = []
+    closed_until = ledger.closed_until
+    for chunk in read_chunks(file, file_name, chunk_rows):
+        rows, errors = validate_chunk(chunk, kategori_map, closed_until)
+        valid_chunks.append(rows)
+        error_chunks.append(errors)
+
+    errors = pd.concat(error_chunks, ignore_index=True) if error_chunks else pd.DataFrame(columns=ERROR_COLUMNS)
+    if not errors.empty:
+        # Satu baris laporan per baris file, semua kesalahannya digabung
+        errors = (
+            errors.groupby("Baris", sort=True)["Kesalahan"].agg("; ".join).reset_index()
+        )
+
+    valid = pd.concat(valid_chunks, ignore_index=True) if valid_chunks else pd.DataFrame(columns=COLUMNS)
+    if not valid.empty:
+        ledger.add_many(valid, journal=journal)
+    return len(valid), errors
@@ -0,0 +1,399 @@
+import functools
+import heapq
+import math
+import re
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate
+
+import pandas as pd
+
+# Semua index di modul ini mengikuti protokol yang sama, dipanggil oleh Ledger:
+#   add(row_id, row)     setelah baris baru disimpan (juga untuk sisi "baru" dari edit)
+#   add_many(items)      seperti add untuk banyak (row_id, row) sekaligus (input massal)
+#   remove(row_id, row)  sebelum baris dihapus (juga untuk sisi "lama" dari edit)
+
+
+# =======================================================================================
+# INDEX PER AKUN (BUKU BESAR)
+# =======================================================================================
+class _AccountBook:
+    """Baris satu akun, terurut (tanggal, id), beserta saldo berjalan.
+
+    Saldo berjalan hanya dihitung ulang mulai posisi perubahan paling awal, dan baru
+    saat dibaca. Transaksi baru biasanya bertanggal terbaru, jadi biayanya kecil.
+    """
+
+    __slots__ = ("keys", "amounts", "_saldo", "_dirty_from")
+
+    def __init__(self, keys=(), amounts=()):
+        self.keys = list(keys)          # (tanggal, id)
+        self.amounts = list(amounts)    # debit - kredit
+        self._saldo = []
+        self._dirty_from = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def insert(self, key, amount):
+        pos = bisect_right(self.keys, key)
+        self.keys.insert(pos, key)
+        self.amounts.insert(pos, amount)
+        self._dirty_from = min(self._dirty_from, pos)
+
+    def extend(self, keys, amounts):
+        if len(keys) < 64:
+            for key, amount in zip(keys, amounts):
+                self.insert(key, amount)
+            return
+        # Untuk batch besar: gabung lalu urutkan ulang sekali, bukan insert satu per satu
+        first = bisect_right(self.keys, min(keys))
+        merged = sorted(zip(self.keys + list(keys), self.amounts + list(amounts)))
+        self.keys = [k for k, _ in merged]
+        self.amounts = [a for _, a in merged]
+        self._dirty_from = min(self._dirty_from, first)
+
+    def remove(self, key):
+        pos = bisect_left(self.keys, key)
+        del self.keys[pos]
+        del self.amounts[pos]
+        self._dirty_from = min(self._dirty_from, pos)
+
+    def saldo(self):
+        start = self._dirty_from
+        if start < len(self.amounts):
+            del self._saldo[start:]
+            initial = self._saldo[-1] if self._saldo else 0
+            self._saldo.extend(accumulate(self.amounts[start:], initial=initial))
+            # accumulate(initial=...) ikut mengembalikan nilai awal; buang
+            del self._saldo[start]
+        del self._saldo[len(self.amounts):]
+        self._dirty_from = len(self.amounts)
+        return self._saldo
+
+
+class AccountIndex:
+    """Posisi baris per akun (terurut tanggal) dan saldo berjalannya."""
+
+    def __init__(self):
+        self.books = {}
+
+    @classmethod
+    def from_frame(cls, frame):
+        index = cls()
+        if frame.empty:
+            return index
+        df = frame[["Tanggal", "Akun"]].assign(
+            _id=frame.index, _amount=frame["Debit"] - frame["Kredit"]
+        )
+        df = df.sort_values(["Akun", "Tanggal", "_id"], kind="mergesort")
+        for akun, group in df.groupby("Akun", sort=False):
+            keys = zip(group["Tanggal"].tolist(), group["_id"].tolist())
+            index.books[akun] = _AccountBook(keys, group["_amount"].tolist())
+        return index
+
+    def add(self, row_id, row):
+        book = self.books.get(row["Akun"])
+        if book is None:
+            book = self.books[row["Akun"]] = _AccountBook()
+        book.insert((row["Tanggal"], row_id), int(row["Debit"]) - int(row["Kredit"]))
+
+    def add_many(self, items):
+        per_akun = {}
+        for row_id, row in items:
+            keys, amounts = per_akun.setdefault(row["Akun"], ([], []))
+            keys.append((row["Tanggal"], row_id))
+            amounts.append(int(row["Debit"]) - int(row["Kredit"]))
+        for akun, (keys, amounts) in per_akun.items():
+            book = self.books.get(akun)
+            if book is None:
+                book = self.books[akun] = _AccountBook()
+            book.extend(keys, amounts)
+
+    def remove(self, row_id, row):
+        book = self.books[row["Akun"]]
+        book.remove((row["Tanggal"], row_id))
+        if not book:
+            del self.books[row["Akun"]]
+
+    def accounts(self):
+        """Nama akun yang punya transaksi, urut abjad."""
+        return sorted(self.books)
+
+    def ledger(self, akun, start=None, end=None):
+        """(id baris terurut tanggal, saldo berjalan) untuk satu akun.
+
+        `start`/`end` (inklusif) membatasi rentang tanggal lewat bisect; saldo berjalannya
+        tetap kumulatif sejak transaksi pertama.
+        """
+        book = self.books.get(akun)
+        if book is None:
+            return [], []
+        lo, hi = _date_bounds(book.keys, start, end)
+        return [row_id for _, row_id in book.keys[lo:hi]], book.saldo()[lo:hi]
+
+    def ledger_many(self, akuns, start=None, end=None):
+        """Seperti `ledger` untuk gabungan beberapa akun (mis. akun induk dan sub-akunnya).
+
+        Baris setiap akun sudah terurut, jadi cukup digabung (merge), tanpa sort ulang.
+        """
+        used = [akun for akun in akuns if akun in self.books]
+        if len(used) <= 1:
+            return self.ledger(used[0], start, end) if used else ([], [])
+        books = [self.books[akun] for akun in used]
+        merged = list(heapq.merge(*(zip(book.keys, book.amounts) for book in books)))
+        keys = [key for key, _ in merged]
+        saldo = list(accumulate(amount for _, amount in merged))
+        lo, hi = _date_bounds(keys, start, end)
+        return [row_id for _, row_id in keys[lo:hi]], saldo[lo:hi]
+
+    def balance_before(self, akun, tanggal):
+        """Saldo `akun` dari semua transaksi sebelum `tanggal`."""
+        book = self.books.get(akun)
+        if book is None:
+            return 0
+        pos, _ = _date_bounds(book.keys, tanggal, None)
+        return book.saldo()[pos - 1] if pos else 0
+
+
+def _date_bounds(keys, start, end):
+    """Posisi [lo, hi) di `keys` terurut (tanggal, id) untuk tanggal start..end inklusif."""
+    lo = 0 if start is None else bisect_left(keys, (start, -math.inf))
+    hi = len(keys) if end is None else bisect_right(keys, (end, math.inf))
+    return lo, hi
+
+
+# =======================================================================================
+# INDEX TANGGAL (FILTER RENTANG TANGGAL)
+# =======================================================================================
+class DateIndex:
+    """Id seluruh transaksi terurut (tanggal, id).
+
+    Rentang tanggal dipotong dengan bisect, jadi tampilan "bulan ini" hanya menyentuh
+    baris bulan itu berapa pun panjang riwayat ledger.
+    """
+
+    def __init__(self, keys=()):
+        # Tanggal disimpan sebagai int nanodetik: membangun dan membandingkannya jauh lebih
+        # murah daripada objek Timestamp
+        self.keys = list(keys)  # (tanggal ns, id)
+
+    @classmethod
+    def from_frame(cls, frame):
+        if frame.empty:
+            return cls()
+        df = frame[["Tanggal"]].assign(_id=frame.index)
+        df = df.sort_values(["Tanggal", "_id"], kind="mergesort")
+        return cls(zip(df["Tanggal"].to_numpy().view("i8").tolist(), df["_id"].tolist()))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, row_id, row):
+        insort(self.keys, (row["Tanggal"].value, row_id))
+
+    def add_many(self, items):
+        keys = [(row["Tanggal"].value, row_id) for row_id, row in items]
+        if len(keys) < 64:
+            for key in keys:
+                insort(self.keys, key)
+        else:
+            # Dua bagian yang masing-masing hampir terurut: timsort menggabungnya hampir linear
+            self.keys = sorted(self.keys + keys)
+
+    def remove(self, row_id, row):
+        del self.keys[bisect_left(self.keys, (row["Tanggal"].value, row_id))]
+
+    def ids(self, start=None, end=None):
+        """Id transaksi bertanggal start..end (inklusif, None = tanpa batas), terurut tanggal."""
+        start = None if start is None else pd.Timestamp(start).value
+        end = None if end is None else pd.Timestamp(end).value
+        lo, hi = _date_bounds(self.keys, start, end)
+        return [row_id for _, row_id in self.keys[lo:hi]]
+
+
+# =======================================================================================
+# INDEX TEKS DESKRIPSI (PENCARIAN)
+# =======================================================================================
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Kata-kata unik (huruf kecil) dalam satu teks."""
+    return set(_TOKEN.findall(str(text or "").lower()))
+
+
+class TextIndex:
+    """Inverted index kata di Deskripsi -> id baris, dengan pencarian awalan kata.
+
+    Daftar kata disimpan terurut sehingga semua kata berawalan tertentu bisa diambil
+    dengan bisect, tanpa memindai teks setiap baris.
+    """
+
+    def __init__(self):
+        self.postings = {}  # kata -> set id baris
+        self.tokens = []    # semua kata, terurut
+
+    @classmethod
+    def from_frame(cls, frame):
+        index = cls()
+        seen = {}  # deskripsi yang sama (mis. transaksi rutin) cukup dipecah sekali
+        for row_id, text in zip(frame.index.tolist(), frame["Deskripsi"].tolist()):
+            tokens = seen.get(text)
+            if tokens is None:
+                tokens = seen[text] = tokenize(text)
+            for token in tokens:
+                index.postings.setdefault(token, set()).add(row_id)
+        index.tokens = sorted(index.postings)
+        return index
+
+    def add(self, row_id, row):
+        self.add_many([(row_id, row)])
+
+    def add_many(self, items):
+        new_tokens = []
+        for row_id, row in items:
+            for token in tokenize(row["Deskripsi"]):
+                ids = self.postings.get(token)
+                if ids is None:
+                    ids = self.postings[token] = set()
+                    new_tokens.append(token)
+                ids.add(row_id)
+        if len(new_tokens) < 64:
+            for token in new_tokens:
+                insort(self.tokens, token)
+        else:
+            self.tokens = sorted(self.tokens + new_tokens)
+
+    def remove(self, row_id, row):
+        for token in tokenize(row["Deskripsi"]):
+            ids = self.postings[token]
+            ids.discard(row_id)
+            if not ids:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+
+    def search(self, query):
+        """Id baris yang Deskripsi-nya memuat semua kata di `query` (per kata: cocok awalan)."""
+        result = None
+        # Kata terpanjang biasanya paling selektif; irisan berikutnya jadi kecil
+        for word in sorted(tokenize(query), key=len, reverse=True):
+            matches = self._prefix(word)
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        return result or set()
+
+    def _prefix(self, prefix):
+        lo = bisect_left(self.tokens, prefix)
+        hi = bisect_left(self.tokens, prefix + "\U0010ffff", lo)
+        return set().union(*(self.postings[token] for token in self.tokens[lo:hi]))
+
+
+# =======================================================================================
+# SALDO PER (KATEGORI, AKUN) — NERACA
+# =======================================================================================
+BALANCE_COLUMNS = ["Kategori", "Akun", "Debit", "Kredit", "Saldo"]
+
+
+def aggregate_balances(frame):
+    """Satu groupby (Kategori, Akun) -> total Debit, Kredit dan Saldo per akun."""
+    if frame.empty:
+        return pd.DataFrame(columns=BALANCE_COLUMNS)
+    table = frame.groupby(["Kategori", "Akun"], observed=True)[["Debit", "Kredit"]].sum()
+    table["Saldo"] = table["Debit"] - table["Kredit"]
+    # Urutan dan tipe sama dengan MonthlyBalanceIndex.table()
+    table = table.reset_index().astype({"Kategori": str, "Akun": str})
+    return table.sort_values(["Kategori", "Akun"], ignore_index=True)[BALANCE_COLUMNS]
+
+
+def combine_balances(*tables):
+    """Jumlahkan beberapa tabel saldo per akun (mis. saldo penutupan + transaksi sesudahnya)."""
+    tables = [t for t in tables if not t.empty]
+    if not tables:
+        return pd.DataFrame(columns=BALANCE_COLUMNS)
+    table = pd.concat(tables).groupby(["Kategori", "Akun"])[["Debit", "Kredit"]].sum()
+    table["Saldo"] = table["Debit"] - table["Kredit"]
+    return table.reset_index()[BALANCE_COLUMNS]
+
+
+def category_totals(table):
+    """Jumlahkan tabel saldo per akun menjadi saldo per kategori."""
+    return table.groupby("Kategori", observed=True)["Saldo"].sum().to_dict()
+
+
+class MonthlyBalanceIndex:
+    """Total debit/kredit per (bulan, kategori, akun), diperbarui di setiap mutasi.
+
+    Dibangun dengan satu groupby saat load. Neraca, Neraca Saldo dan Laba Rugi untuk
+    rentang bulan mana pun cukup menjumlahkan index ini (jumlah bulan x jumlah akun),
+    bukan memindai transaksi; neraca terkini adalah jumlah semua bulan.
+    """
+
+    def __init__(self):
+        self.totals = {}  # (bulan, kategori, akun) -> [debit, kredit, jumlah baris]
+
+    @classmethod
+    def from_frame(cls, frame):
+        index = cls()
+        if frame.empty:
+            return index
+        bulan = frame["Tanggal"].dt.to_period("M").rename("Bulan")
+        grouped = frame.groupby([bulan, "Kategori", "Akun"], observed=True).agg(
+            Debit=("Debit", "sum"), Kredit=("Kredit", "sum"), n=("Debit", "size")
+        )
+        for key, debit, kredit, n in zip(
+            grouped.index, grouped["Debit"], grouped["Kredit"], grouped["n"]
+        ):
+            index.totals[key] = [int(debit), int(kredit), int(n)]
+        return index
+
+    @staticmethod
+    def _key(row):
+        tanggal = row["Tanggal"]
+        return _month(tanggal.year, tanggal.month), row["Kategori"], row["Akun"]
+
+    def add(self, row_id, row):
+        entry = self.totals.setdefault(self._key(row), [0, 0, 0])
+        entry[0] += int(row["Debit"])
+        entry[1] += int(row["Kredit"])
+        entry[2] += 1
+
+    def add_many(self, items):
+        for row_id, row in items:
+            self.add(row_id, row)
+
+    def remove(self, row_id, row):
+        key = self._key(row)
+        entry = self.totals[key]
+        entry[0] -= int(row["Debit"])
+        entry[1] -= int(row["Kredit"])
+        entry[2] -= 1
+        if entry[2] == 0:
+            del self.totals[key]
+
+    def months(self):
+        """Bulan (pd.Period) yang punya transaksi, urut."""
+        return sorted({bulan for bulan, _, _ in self.totals})
+
+    def table(self, start=None, end=None):
+        """Tabel saldo per akun (BALANCE_COLUMNS) dari bulan `start` s.d. `end` (inklusif).
+
+        Urut kategori lalu akun; tanpa `start` dan `end` hasilnya saldo semua transaksi.
+        """
+        sums = {}
+        for (bulan, kategori, akun), (debit, kredit, _) in self.totals.items():
+            if (start is None or bulan >= start) and (end is None or bulan <= end):
+                entry = sums.setdefault((kategori, akun), [0, 0])
+                entry[0] += debit
+                entry[1] += kredit
+        rows = [
+            (kategori, akun, debit, kredit, debit - kredit)
+            for (kategori, akun), (debit, kredit) in sorted(sums.items())
+        ]
+        return pd.DataFrame(rows, columns=BALANCE_COLUMNS)
+
+
+@functools.lru_cache(maxsize=None)
+def _month(year, month):
+    # Timestamp.to_period per baris mahal; jumlah bulan yang berbeda sedikit
+    return pd.Period(year=year, month=month, freq="M")
@@ -0,0 +1,141 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Export besar berjalan paralel paling banyak sebanyak ini; sisanya menunggu di antrean
+MAX_WORKERS = 2
+# Job yang sudah selesai (beserta file hasilnya) dibuang setelah sekian detik
+JOB_TTL = 60 * 60
+
+ANTRI = "Antri"
+BERJALAN = "Berjalan"
+SELESAI = "Selesai"
+DIBATALKAN = "Dibatalkan"
+GAGAL = "Gagal"
+
+
+class JobCancelled(Exception):
+    """Dilempar dari callback progress saat job diminta berhenti."""
+
+
+# =======================================================================================
+# SATU JOB
+# =======================================================================================
+class Job:
+    """Satu pekerjaan latar belakang beserta status, progress dan hasilnya.
+
+    Fungsi job menerima `report(fraksi)` sebagai callback progress. Pembatalan bersifat
+    kooperatif: callback itu melempar JobCancelled pada pemanggilan berikutnya.
+    """
+
+    def __init__(self, job_id, label, file_name, mime):
+        self.id = job_id
+        self.label = label
+        self.file_name = file_name
+        self.mime = mime
+        self.status = ANTRI
+        self.progress = 0.0
+        self.error = None
+        self.finished_at = None
+        self.future = None
+        self._result = None  # bytes atau file biner yang terbuka
+        self._cancel = threading.Event()
+
+    @property
+    def active(self):
+        return self.status in (ANTRI, BERJALAN)
+
+    def report(self, fraction):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = fraction
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self._finish(DIBATALKAN)  # belum sempat jalan
+
+    def data(self):
+        """Isi hasil sebagai bytes (dipanggil tombol download saat diklik)."""
+        result = self._result
+        if hasattr(result, "read"):
+            result.seek(0)
+            return result.read()
+        return result
+
+    def close(self):
+        if hasattr(self._result, "close"):
+            self._result.close()
+        self._result = None
+
+    def _finish(self, status):
+        self.status = status
+        self.finished_at = time.monotonic()
+
+
+# =======================================================================================
+# POOL JOB
+# =======================================================================================
+class JobManager:
+    """Menjalankan job di thread pool berbatas; dipakai bersama semua sesi."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="keuangan-job")
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, func, label, file_name, mime):
+        """Jadwalkan `func(report)`; hasilnya (bytes atau file) menjadi isi unduhan."""
+        self._prune()
+        with self._lock:
+            job = Job(next(self._ids), label, file_name, mime)
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, func)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def dismiss(self, job_id):
+        """Batalkan (jika masih jalan) dan lupakan job beserta hasilnya."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+        if job is not None:
+            job.cancel()
+            job.close()
+
+    @staticmethod
+    def _run(job, func):
+        if job.status != ANTRI:
+            return
+        job.status = BERJALAN
+        try:
+            result = func(job.report)
+        except JobCancelled:
+            job._finish(DIBATALKAN)
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job._finish(GAGAL)
+        else:
+            job._result = result
+            if job._cancel.is_set():
+                job.close()  # dibatalkan/ditutup tepat saat selesai; hasilnya tidak dipakai
+                job._finish(DIBATALKAN)
+                return
+            job.progress = 1.0
+            job._finish(SELESAI)
+
+    def _prune(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                job for job in self._jobs.values()
+                if job.finished_at is not None and now - job.finished_at > JOB_TTL
+            ]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            job.close()
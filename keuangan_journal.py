@@ -0,0 +1,120 @@
+from collections import deque
+
+# Jumlah langkah undo (dan redo) yang disimpan per sesi
+UNDO_DEPTH = 50
+
+
+# =======================================================================================
+# SATU LANGKAH PERUBAHAN
+# =======================================================================================
+class JournalEntry:
+    """Delta satu batch mutasi: id -> (baris sebelum, baris sesudah).
+
+    None berarti baris tidak ada (sebelum = None: ditambahkan, sesudah = None: dihapus).
+    Hanya baris yang berubah yang disimpan, jadi ukurannya sebanding dengan editnya,
+    bukan dengan ukuran ledger. `versions` adalah versi baris sesudah perubahan, dipakai
+    untuk menolak undo jika baris itu sudah diubah user lain.
+    """
+
+    __slots__ = ("delta", "versions")
+
+    def __init__(self, delta, versions):
+        self.delta = delta
+        self.versions = versions
+
+    def inverse_changes(self):
+        """Argumen `Ledger.apply_changes` yang mengembalikan keadaan sebelum perubahan."""
+        updates, restores, deletes = {}, {}, []
+        for row_id, (before, after) in self.delta.items():
+            if before is None:
+                deletes.append(row_id)
+            elif after is None:
+                restores[row_id] = before
+            else:
+                updates[row_id] = before
+        return {
+            "updates": updates,
+            "restores": restores,
+            "deletes": deletes,
+            "expected_versions": self.versions,
+        }
+
+    def describe(self):
+        """Ringkasan singkat untuk tombol Undo/Redo, mis. "Hapus ID 7"."""
+        counts = {"Tambah": [], "Ubah": [], "Hapus": []}
+        for row_id, (before, after) in self.delta.items():
+            action = "Tambah" if before is None else "Hapus" if after is None else "Ubah"
+            counts[action].append(row_id)
+        parts = [
+            f"{action} ID {ids[0]}" if len(ids) == 1 else f"{action} {len(ids)} baris"
+            for action, ids in counts.items() if ids
+        ]
+        return ", ".join(parts)
+
+
+# =======================================================================================
+# RIWAYAT UNDO/REDO
+# =======================================================================================
+class UndoJournal:
+    """Riwayat undo/redo berbatas (`depth` langkah) untuk satu sesi.
+
+    Undo tidak menyimpan salinan tabel; setiap langkah menyimpan delta barisnya dan
+    dibatalkan dengan menerapkan operasi kebalikannya lewat `Ledger.apply_changes`.
+    Hasil undo dicatat sebagai langkah baru di tumpukan redo (dan sebaliknya), sehingga
+    redo hanyalah undo dari undo.
+    """
+
+    def __init__(self, depth=UNDO_DEPTH):
+        self._undo = deque(maxlen=depth)
+        self._redo = deque(maxlen=depth)
+        self._target = None  # tumpukan tujuan saat undo/redo sedang diterapkan
+
+    def record(self, entry):
+        """Dipanggil `Ledger.apply_changes` setelah perubahan tersimpan."""
+        if self._target is not None:
+            self._target.append(entry)
+            return
+        self._undo.append(entry)
+        self._redo.clear()  # perubahan baru memutus rantai redo
+
+    @property
+    def can_undo(self):
+        return bool(self._undo)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def undo_label(self):
+        return self._undo[-1].describe() if self._undo else None
+
+    def redo_label(self):
+        return self._redo[-1].describe() if self._redo else None
+
+    def undo(self, ledger):
+        """Batalkan langkah terakhir.
+
+        Melempar LedgerConflict/PeriodClosed dari ledger; langkahnya tetap di riwayat.
+        """
+        self._replay(ledger, self._undo, self._redo)
+
+    def redo(self, ledger):
+        self._replay(ledger, self._redo, self._undo)
+
+    def _replay(self, ledger, source, target):
+        entry = source[-1]
+        self._target = target
+        try:
+            ledger.apply_changes(**entry.inverse_changes(), journal=self)
+        finally:
+            self._target = None
+        source.pop()
+
+        # Baris yang baru dikembalikan punya versi baru. Langkah terdekat di bawahnya yang
+        # menyentuh baris itu harus mengharapkan versi ini, bukan versi saat ia dicatat.
+        versions = dict(target[-1].versions)
+        for older in reversed(source):
+            if not versions:
+                break
+            for row_id in versions.keys() & older.delta.keys():
+                older.versions[row_id] = versions.pop(row_id)
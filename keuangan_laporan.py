@@ -0,0 +1,58 @@
+import pandas as pd
+
+from keuangan_index import category_totals
+
+# Akun nominal (masuk Laba Rugi); kategori lain adalah akun riil di Neraca
+PENDAPATAN = "Pendapatan"
+BEBAN = "Beban"
+NERACA_KATEGORI = ["Aset", "Kewajiban", "Ekuitas"]
+
+TRIAL_BALANCE_COLUMNS = ["Akun", "Kategori", "Debit", "Kredit", "Saldo Debit", "Saldo Kredit"]
+LABA_RUGI_COLUMNS = ["Kategori", "Akun", "Jumlah"]
+
+# Ketiga laporan di bawah dibentuk dari tabel saldo per akun yang sama (BALANCE_COLUMNS,
+# hasil Ledger.balance_table / Ledger.period_balance_table), sehingga selalu konsisten.
+
+
+# =======================================================================================
+# NERACA SALDO
+# =======================================================================================
+def trial_balance(table):
+    """Neraca saldo: total mutasi dan saldo akhir setiap akun di sisi debit atau kredit."""
+    return pd.DataFrame({
+        "Akun": table["Akun"],
+        "Kategori": table["Kategori"],
+        "Debit": table["Debit"],
+        "Kredit": table["Kredit"],
+        "Saldo Debit": table["Saldo"].clip(lower=0),
+        "Saldo Kredit": (-table["Saldo"]).clip(lower=0),
+    }, columns=TRIAL_BALANCE_COLUMNS)
+
+
+# =======================================================================================
+# LABA RUGI
+# =======================================================================================
+def income_statement(table):
+    """Baris Laba Rugi: pendapatan (kredit - debit) dan beban (debit - kredit) per akun."""
+    rows = table[table["Kategori"].isin([PENDAPATAN, BEBAN])]
+    jumlah = rows["Saldo"].where(rows["Kategori"] == BEBAN, -rows["Saldo"])
+    return pd.DataFrame({
+        "Kategori": rows["Kategori"], "Akun": rows["Akun"], "Jumlah": jumlah
+    }, columns=LABA_RUGI_COLUMNS).reset_index(drop=True)
+
+
+def net_income(table):
+    """Laba (positif) atau rugi (negatif) dari akun pendapatan dan beban di `table`."""
+    totals = category_totals(table)
+    return -(totals.get(PENDAPATAN, 0) + totals.get(BEBAN, 0))
+
+
+# =======================================================================================
+# NERACA
+# =======================================================================================
+def neraca_totals(table):
+    """Total Aset, Kewajiban, Ekuitas dan Laba berjalan (dari akun nominal yang sama)."""
+    totals = category_totals(table)
+    result = {kategori: totals.get(kategori, 0) for kategori in NERACA_KATEGORI}
+    result["Laba"] = net_income(table)
+    return result
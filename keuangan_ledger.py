@@ -0,0 +1,691 @@
+import threading
+from bisect import bisect_right
+
+import pandas as pd
+
+from keuangan_akun import ChartOfAccounts
+from keuangan_index import (
+    AccountIndex, DateIndex, MonthlyBalanceIndex, TextIndex,
+    aggregate_balances, combine_balances,
+)
+from keuangan_journal import JournalEntry
+from keuangan_profiling import profiled
+from keuangan_store import COLUMNS
+
+
+# =======================================================================================
+# SKEMA KOLOM
+# =======================================================================================
+# Tanggal datetime64, Akun/Kategori categorical (urut chart of accounts), Debit/Kredit int64.
+# Dipakai saat load, insert, edit dan import sehingga laporan selalu bekerja di dtype native.
+def normalize_row(row):
+    """Samakan tipe satu baris transaksi dengan skema kolom ledger."""
+    return {
+        "Tanggal": pd.Timestamp(row["Tanggal"]).normalize(),
+        "Deskripsi": str(row["Deskripsi"] or ""),
+        "Akun": str(row["Akun"]),
+        "Kategori": str(row["Kategori"]),
+        "Debit": int(row["Debit"]),
+        "Kredit": int(row["Kredit"]),
+    }
+
+
+def normalize_frame(frame):
+    """`normalize_row` untuk setiap baris `frame` sekaligus per kolom (mis. hasil import)."""
+    columns = [
+        pd.to_datetime(frame["Tanggal"]).dt.normalize().tolist(),
+        frame["Deskripsi"].fillna("").astype(str).tolist(),
+        frame["Akun"].astype(str).tolist(),
+        frame["Kategori"].astype(str).tolist(),
+        frame["Debit"].astype("int64").tolist(),
+        frame["Kredit"].astype("int64").tolist(),
+    ]
+    return [dict(zip(COLUMNS, values)) for values in zip(*columns)]
+
+
+def apply_schema(frame, akun=(), kategori=()):
+    """Kembalikan salinan `frame` dengan dtype sesuai skema.
+
+    `akun` dan `kategori` adalah urutan kategori dari chart of accounts; nilai yang belum
+    terdaftar ditambahkan di belakang.
+    """
+    return pd.DataFrame({
+        "Tanggal": pd.to_datetime(frame["Tanggal"]).astype("datetime64[ns]"),
+        "Deskripsi": frame["Deskripsi"].fillna("").astype(str),
+        "Akun": _categorical(frame["Akun"], akun),
+        "Kategori": _categorical(frame["Kategori"], kategori),
+        "Debit": frame["Debit"].astype("int64"),
+        "Kredit": frame["Kredit"].astype("int64"),
+    }, index=frame.index)
+
+
+def _categorical(values, categories):
+    categories = list(categories)
+    extra = sorted(set(values.dropna().unique()) - set(categories))
+    return pd.Categorical(values, categories=categories + extra)
+
+
+def _unify_categories(frame, other):
+    """Perluas kategori `frame` agar sama dengan `other` (hasil apply_schema atas kategori frame)."""
+    updates = {
+        col: frame[col].cat.set_categories(other[col].cat.categories)
+        for col in ("Akun", "Kategori")
+        if not frame[col].cat.categories.equals(other[col].cat.categories)
+    }
+    return frame.assign(**updates) if updates else frame
+
+
+# =======================================================================================
+# LEDGER IN-MEMORY (BUFFER APPEND)
+# =======================================================================================
+class LedgerConflict(Exception):
+    """Transaksi sudah diubah atau dihapus pengguna lain sejak dibaca."""
+
+
+class PeriodClosed(Exception):
+    """Transaksi jatuh di periode yang sudah ditutup (read-only)."""
+
+
+class Ledger:
+    """Buku transaksi in-memory yang menulis langsung ke `LedgerStore`.
+
+    Perubahan tidak langsung diterapkan ke DataFrame. Baris baru, baris yang diedit dan
+    id yang dihapus ditampung dulu, lalu digabung sekaligus saat `frame` dibaca. Jadi
+    n kali `add` hanya memicu satu kali concat, bukan n kali salin seluruh tabel.
+
+    Satu objek dipakai bersama oleh semua sesi. Mutasi dan pembacaan index dijaga lock;
+    DataFrame yang sudah dikembalikan `frame` tidak pernah diubah lagi, sehingga setiap
+    pembaca memegang snapshot yang konsisten tanpa perlu menyalinnya.
+    """
+
+    def __init__(self, store, frame=None):
+        self.store = store
+        self._lock = threading.RLock()
+        frame = store.load() if frame is None else frame
+        kategori_map, categories = store.load_accounts(), store.load_categories()
+        self._frame = apply_schema(frame, kategori_map, categories)
+        self._pending = {}    # id -> row, baris baru yang belum masuk _frame
+        self._changed = {}    # id -> row, hasil edit untuk baris yang sudah di _frame
+        self._deleted = set()  # id baris di _frame yang sudah dihapus
+
+        # Naik di setiap mutasi; dipakai sebagai kunci cache hasil turunan (export, dsb.)
+        self.version = 0
+        self._cache = {}
+        # Versi per baris untuk optimistic locking (baris yang belum pernah diedit = 0)
+        self._row_versions = {}
+        # Tanggal akhir periode yang ditutup -> saldo per akun saat itu, urut tanggal
+        self._closings = {tanggal: table for tanggal, _, table in store.load_closings()}
+
+        self.total_debit = int(self._frame["Debit"].sum())
+        self.total_kredit = int(self._frame["Kredit"].sum())
+
+        # Index turunan yang diperbarui di setiap mutasi (lihat protokol di keuangan_index)
+        self.accounts = AccountIndex.from_frame(self._frame)
+        self.dates = DateIndex.from_frame(self._frame)
+        self.text = TextIndex.from_frame(self._frame)
+        self.monthly = MonthlyBalanceIndex.from_frame(self._frame)
+        # Chart of accounts ikut protokol index untuk menghitung pemakaian setiap akun
+        self.chart = ChartOfAccounts.from_frame(
+            self._frame, kategori_map, categories, store.load_parents()
+        )
+        self._indexes = [
+            self.accounts, self.dates, self.text, self.monthly, self.chart
+        ]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._frame) - len(self._deleted) + len(self._pending)
+
+    def __contains__(self, row_id):
+        with self._lock:
+            if row_id in self._pending:
+                return True
+            return row_id not in self._deleted and row_id in self._frame.index
+
+    @property
+    def empty(self):
+        return len(self) == 0
+
+    def row(self, row_id):
+        """Ambil satu baris sebagai dict tanpa harus menggabungkan buffer."""
+        with self._lock:
+            if row_id in self._pending:
+                return dict(self._pending[row_id])
+            if row_id in self._changed:
+                return dict(self._changed[row_id])
+            if row_id in self._deleted:
+                raise KeyError(row_id)
+            return self._frame.loc[row_id, COLUMNS].to_dict()
+
+    def row_version(self, row_id):
+        with self._lock:
+            return self._row_versions.get(row_id, 0)
+
+    def totals(self):
+        """(total debit, total kredit) yang dibaca bersamaan."""
+        with self._lock:
+            return self.total_debit, self.total_kredit
+
+    @property
+    def closed_until(self):
+        """Tanggal akhir periode terakhir yang ditutup (None jika belum pernah)."""
+        with self._lock:
+            return next(reversed(self._closings), None)
+
+    # -----------------------------------------------------------------------------------
+    # Mutasi
+    # -----------------------------------------------------------------------------------
+    def add(self, row, journal=None):
+        (row_id,) = self.add_many([row], journal=journal)
+        return row_id
+
+    def add_many(self, rows, journal=None):
+        return self.apply_changes(inserts=rows, journal=journal)
+
+    def update(self, row_id, row, expected_version=None, journal=None):
+        """Ubah satu baris.
+
+        Jika `expected_version` diberikan (hasil `row_version` saat form edit dibuka) dan
+        baris sudah diubah orang lain sejak itu, perubahan ditolak dengan LedgerConflict.
+        """
+        expected = None if expected_version is None else {row_id: expected_version}
+        self.apply_changes(updates={row_id: row}, expected_versions=expected, journal=journal)
+
+    def delete(self, row_id, journal=None):
+        self.apply_changes(deletes=[row_id], journal=journal)
+
+    @profiled()
+    def apply_changes(self, updates=None, inserts=(), deletes=(), expected_versions=None,
+                      restores=None, journal=None):
+        """Terapkan edit (dict id -> baris), tambah dan hapus sebagai satu batch.
+
+        Semua perubahan masuk dalam satu transaksi database dan satu kenaikan versi; index
+        hanya disentuh untuk baris yang berubah. Jika satu baris saja bentrok
+        (`expected_versions`: id -> versi saat dibaca) atau jatuh di periode tertutup,
+        seluruh batch ditolak. `restores` (id -> baris) mengembalikan baris yang sudah
+        dihapus dengan id lamanya. `inserts` boleh berupa DataFrame (mis. hasil import),
+        yang dinormalisasi per kolom sekaligus. Jika `journal` diberikan, delta baris
+        dicatat ke sana (lihat keuangan_journal). Kembalikan id baris yang ditambahkan.
+        """
+        updates = {row_id: normalize_row(row) for row_id, row in (updates or {}).items()}
+        restores = {row_id: normalize_row(row) for row_id, row in (restores or {}).items()}
+        if isinstance(inserts, pd.DataFrame):
+            inserts = normalize_frame(inserts)
+        else:
+            inserts = [normalize_row(row) for row in inserts]
+        deletes = list(dict.fromkeys(deletes))
+        if not set(updates).isdisjoint(deletes):
+            raise ValueError("Baris yang dihapus tidak bisa sekaligus diubah.")
+
+        with self._lock:
+            old = {row_id: self._current(row_id) for row_id in [*updates, *deletes]}
+            for row_id, version in (expected_versions or {}).items():
+                if row_id in old and self._row_versions.get(row_id, 0) != version:
+                    raise LedgerConflict(row_id)
+            for row_id in restores:
+                if row_id in self:
+                    raise LedgerConflict(row_id)
+            self._check_open(*old.values(), *updates.values(), *restores.values(), *inserts)
+
+            ids = self.store.apply_changes(updates, inserts, deletes, restores)
+
+            for row_id, row in updates.items():
+                if row_id in self._pending:
+                    self._pending[row_id] = row
+                else:
+                    self._changed[row_id] = row
+                self._count(old[row_id], -1)
+                self._count(row, 1)
+                for index in self._indexes:
+                    index.remove(row_id, old[row_id])
+                    index.add(row_id, row)
+                self._row_versions[row_id] = self._row_versions.get(row_id, 0) + 1
+
+            for row_id in deletes:
+                if self._pending.pop(row_id, None) is None:
+                    self._changed.pop(row_id, None)
+                    self._deleted.add(row_id)
+                self._count(old[row_id], -1)
+                for index in self._indexes:
+                    index.remove(row_id, old[row_id])
+                # Versi tetap dinaikkan (tidak dibuang) supaya baris yang dipulihkan undo
+                # tidak kembali ke versi yang pernah dipegang form edit lama
+                self._row_versions[row_id] = self._row_versions.get(row_id, 0) + 1
+
+            for row_id, row in restores.items():
+                if row_id in self._deleted:
+                    # Baris fisiknya masih ada di _frame; cukup batalkan tanda hapusnya
+                    self._deleted.discard(row_id)
+                    self._changed[row_id] = row
+                else:
+                    self._pending[row_id] = row
+                self._count(row, 1)
+                for index in self._indexes:
+                    index.add(row_id, row)
+                self._row_versions[row_id] = self._row_versions.get(row_id, 0) + 1
+
+            items = list(zip(ids, inserts))
+            for row_id, row in items:
+                self._pending[row_id] = row
+                self._count(row, 1)
+            if items:
+                for index in self._indexes:
+                    index.add_many(items)
+            self.version += 1
+
+            if journal is not None:
+                delta = {row_id: (old[row_id], row) for row_id, row in updates.items()}
+                delta.update((row_id, (old[row_id], None)) for row_id in deletes)
+                delta.update((row_id, (None, row)) for row_id, row in restores.items())
+                delta.update((row_id, (None, row)) for row_id, row in items)
+                versions = {
+                    row_id: self._row_versions.get(row_id, 0)
+                    for row_id, (_, after) in delta.items() if after is not None
+                }
+                journal.record(JournalEntry(delta, versions))
+        return ids
+
+    def _current(self, row_id):
+        try:
+            return self.row(row_id)
+        except KeyError:
+            # Sudah dihapus oleh sesi lain
+            raise LedgerConflict(row_id) from None
+
+    def _check_open(self, *rows):
+        closed = self.closed_until
+        if closed is not None and any(row["Tanggal"] <= closed for row in rows):
+            raise PeriodClosed(f"Periode s.d. {closed:%Y-%m-%d} sudah ditutup (read-only).")
+
+    def _count(self, row, sign):
+        self.total_debit += sign * int(row["Debit"])
+        self.total_kredit += sign * int(row["Kredit"])
+
+    # -----------------------------------------------------------------------------------
+    # Chart of accounts
+    # -----------------------------------------------------------------------------------
+    def add_account(self, nama, kategori, induk=None):
+        """Daftarkan akun baru, sebagai sub-akun dari `induk` jika diberikan.
+
+        ValueError jika nama sudah ada atau induknya tidak valid.
+        """
+        with self._lock:
+            if nama in self.chart:
+                raise ValueError("Akun sudah ada.")
+            self.chart.check_parent(nama, induk, kategori)
+            self.store.save_account(nama, kategori, induk)
+            self.chart.add_account(nama, kategori, induk)
+
+    def set_parent(self, nama, induk):
+        """Pindahkan akun ke bawah `induk` (None = tingkat teratas); subtotal ikut dipindah."""
+        with self._lock:
+            self.chart.check_parent(nama, induk, self.chart.kategori(nama))
+            self.store.set_parent(nama, induk)
+            self.chart.set_parent(nama, induk)
+
+    def delete_account(self, nama):
+        """Hapus akun dari chart; ValueError jika masih dipakai transaksi atau punya sub-akun."""
+        with self._lock:
+            # Divalidasi sebelum database disentuh, supaya chart dan database tetap sama
+            self.chart.check_remove(nama)
+            self.store.delete_account(nama)
+            self.chart.remove_account(nama)
+
+    def add_category(self, nama):
+        with self._lock:
+            if nama in self.chart.categories:
+                raise ValueError("Kategori sudah ada.")
+            self.store.save_category(nama)
+            self.chart.add_category(nama)
+
+    # -----------------------------------------------------------------------------------
+    # Laporan
+    # -----------------------------------------------------------------------------------
+    def account_names(self):
+        with self._lock:
+            return self.accounts.accounts()
+
+    def frame_between(self, start=None, end=None):
+        """Transaksi bertanggal start..end (inklusif), dipotong lewat index tanggal.
+
+        Tanpa batas sama sekali dikembalikan `frame` apa adanya (urut id); dengan batas,
+        hasilnya terurut tanggal.
+        """
+        if start is None and end is None:
+            return self.frame
+        with self._lock:
+            ids = self.dates.ids(_timestamp(start), _timestamp(end))
+            frame = self.frame
+        return frame.loc[ids]
+
+    @profiled()
+    def search(self, query, start=None, end=None):
+        """Transaksi yang Deskripsi-nya cocok dengan `query` (urut id), lewat index teks.
+
+        Hanya baris yang cocok yang diambil dari DataFrame; batas tanggal diterapkan ke
+        baris-baris itu saja.
+        """
+        with self._lock:
+            ids = sorted(self.text.search(query))
+            frame = self.frame
+        rows = frame.loc[ids]
+        start, end = _timestamp(start), _timestamp(end)
+        if start is not None:
+            rows = rows[rows["Tanggal"] >= start]
+        if end is not None:
+            rows = rows[rows["Tanggal"] <= end]
+        return rows
+
+    @profiled()
+    def account_ledger(self, akun, start=None, end=None, open_period=True, sub_akun=False):
+        """Baris satu akun bertanggal start..end, terurut tanggal, dengan kolom Saldo berjalan.
+
+        Jika ada periode yang ditutup, secara default hanya transaksi periode berjalan yang
+        diambil; Saldo-nya melanjutkan saldo penutupan (lihat `opening_balance`). Dengan
+        `sub_akun` transaksi semua sub-akunnya ikut digabung dalam satu saldo berjalan.
+        """
+        with self._lock:
+            start = self._period_start(start, open_period)
+            if sub_akun:
+                ids, saldo = self.accounts.ledger_many(
+                    self.chart.subtree(akun), start, _timestamp(end)
+                )
+            else:
+                ids, saldo = self.accounts.ledger(akun, start, _timestamp(end))
+            frame = self.frame
+        df = frame.loc[ids]
+        df["Saldo"] = saldo
+        return df
+
+    @profiled()
+    def all_account_ledgers(self, start=None, end=None, open_period=True):
+        """`account_ledger` untuk semua akun sekaligus, berurutan per akun.
+
+        Index per akun sudah memisahkan baris per akun dan mengurutkannya per tanggal,
+        jadi tidak ada pengurutan ulang: hasilnya hanya gabungan potongan setiap akun.
+        """
+        with self._lock:
+            start = self._period_start(start, open_period)
+            end = _timestamp(end)
+            ids, saldo = [], []
+            for akun in self.accounts.accounts():
+                akun_ids, akun_saldo = self.accounts.ledger(akun, start, end)
+                ids.extend(akun_ids)
+                saldo.extend(akun_saldo)
+            frame = self.frame
+        df = frame.loc[ids]
+        df["Saldo"] = saldo
+        return df
+
+    @profiled()
+    def balance_table(self, as_of=None):
+        """Saldo per (Kategori, Akun); `as_of` membatasi transaksi s.d. tanggal itu.
+
+        Tanpa `as_of` tabel adalah jumlah semua bulan di index per bulan yang selalu
+        terkini (O(jumlah bulan x akun), sekali per versi ledger). Dengan `as_of` dihitung
+        dari saldo penutupan terakhir sebelum tanggal itu, ditambah agregasi transaksi
+        sesudah penutupan sampai `as_of`.
+        """
+        if as_of is None:
+            return self.cached(("saldo", None), self.period_balance_table)
+        as_of = pd.Timestamp(as_of)
+        return self.cached(("saldo", as_of), lambda: self._balances_as_of(as_of))
+
+    def rollup_table(self, as_of=None):
+        """Saldo per akun menurut pohon chart of accounts (lihat `ChartOfAccounts.rollup`).
+
+        Tanpa `as_of` dibaca dari subtotal yang dipelihara di setiap mutasi; dengan `as_of`
+        subtotal dijumlahkan dari `balance_table(as_of)` (O(jumlah akun)).
+        """
+        table = None if as_of is None else self.balance_table(as_of)
+        with self._lock:
+            return self.chart.rollup(table)
+
+    def months(self):
+        """Bulan (pd.Period) yang punya transaksi, urut."""
+        with self._lock:
+            return self.monthly.months()
+
+    @profiled()
+    def period_balance_table(self, start=None, end=None):
+        """Saldo per (Kategori, Akun) dari transaksi bulan `start` s.d. `end` (inklusif).
+
+        Diambil dari index per bulan (O(jumlah bulan x akun)), dasar Neraca Saldo dan
+        Laba Rugi untuk periode mana pun.
+        """
+        start = None if start is None else pd.Period(start, "M")
+        end = None if end is None else pd.Period(end, "M")
+        with self._lock:
+            return self.monthly.table(start, end)
+
+    def _balances_as_of(self, as_of):
+        with self._lock:
+            closing = self._closing_before(as_of)
+            opening = self._closings.get(closing)
+        if closing is None:
+            return aggregate_balances(self.frame_between(None, as_of))
+        rows = self.frame_between(closing + pd.Timedelta(days=1), as_of)
+        return combine_balances(opening, aggregate_balances(rows))
+
+    def _closing_before(self, tanggal):
+        dates = list(self._closings)
+        pos = bisect_right(dates, tanggal)
+        return dates[pos - 1] if pos else None
+
+    # -----------------------------------------------------------------------------------
+    # Penutupan periode
+    # -----------------------------------------------------------------------------------
+    def closings(self):
+        """Daftar (tanggal penutupan, tabel saldo per akun), urut tanggal."""
+        with self._lock:
+            return list(self._closings.items())
+
+    def opening_balance(self, akun, start=None, open_period=True, sub_akun=False):
+        """Saldo awal `akun` untuk tampilan `account_ledger` dengan argumen yang sama.
+
+        Tanpa `start` ini adalah saldo pada penutupan terakhir (0 jika belum ada penutupan).
+        """
+        with self._lock:
+            start = self._period_start(start, open_period)
+            if start is None:
+                return 0
+            akuns = self.chart.subtree(akun) if sub_akun else [akun]
+            return sum(self.accounts.balance_before(a, start) for a in akuns)
+
+    def _period_start(self, start, open_period):
+        # Awal rentang efektif: tidak lebih awal dari hari sesudah penutupan terakhir
+        start = _timestamp(start)
+        closed = self.closed_until if open_period else None
+        if closed is not None:
+            after = closed + pd.Timedelta(days=1)
+            start = after if start is None else max(start, after)
+        return start
+
+    @profiled()
+    def close_period(self, end):
+        """Tutup semua transaksi s.d. `end`: simpan saldo per akun, lalu jadikan read-only."""
+        end = pd.Timestamp(end).normalize()
+        with self._lock:
+            closed = self.closed_until
+            if closed is not None and end <= closed:
+                raise ValueError(f"Periode s.d. {closed:%Y-%m-%d} sudah ditutup.")
+            table = self._balances_as_of(end)
+            self.store.save_closing(end, table)
+            self._closings[end] = table
+            self.version += 1
+        return table
+
+    def cached(self, key, build, discard=None):
+        """Hasil `build()` yang disimpan sampai ledger berubah (versi naik).
+
+        `build` dijalankan di luar lock agar export besar tidak menahan penulisan; hasilnya
+        dicatat dengan versi sebelum build, jadi paling buruk dihitung ulang sekali lagi.
+        Semua entri versi lama dibuang di pemanggilan berikutnya, dan `discard(nilai)`
+        (jika diberikan) dipanggil untuk membersihkannya, mis. menghapus file export lama.
+        """
+        with self._lock:
+            version = self.version
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] == version:
+                return hit[1]
+            stale = self._evict_stale(version)
+        _discard(stale)
+
+        value = build()
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None and hit[0] == version:
+                # Sesi lain selesai membangun lebih dulu: pakai hasilnya, buang hasil ini
+                stale, value = [(value, discard)], hit[1]
+            else:
+                self._cache[key] = (version, value, discard)
+                stale = []
+        _discard(stale)
+        return value
+
+    def _evict_stale(self, version):
+        stale = [key for key, (v, _, _) in self._cache.items() if v != version]
+        return [self._cache.pop(key)[1:] for key in stale]
+
+    # -----------------------------------------------------------------------------------
+    # View DataFrame
+    # -----------------------------------------------------------------------------------
+    @property
+    def frame(self):
+        """DataFrame seluruh transaksi (index = id), digabung dari buffer bila perlu."""
+        with self._lock:
+            if self._pending or self._changed or self._deleted:
+                self._consolidate()
+            return self._frame
+
+    @profiled("Ledger.consolidate")
+    def _consolidate(self):
+        # Selalu membangun DataFrame baru; snapshot lama yang dipegang sesi lain tetap utuh
+        frame = self._frame
+        if self._deleted:
+            frame = frame.drop(list(self._deleted))
+        if self._changed:
+            changed = self._typed_rows(self._changed, frame)
+            frame = _unify_categories(frame, changed).copy()
+            for col in COLUMNS:
+                frame.loc[changed.index, col] = changed[col].to_numpy()
+        if self._pending:
+            pending = self._typed_rows(self._pending, frame)
+            frame = pd.concat([_unify_categories(frame, pending), pending])
+
+        self._frame = frame
+        self._pending = {}
+        self._changed = {}
+        self._deleted = set()
+
+    @staticmethod
+    def _typed_rows(rows, frame):
+        df = pd.DataFrame(list(rows.values()), index=list(rows), columns=COLUMNS)
+        return apply_schema(df, frame["Akun"].cat.categories, frame["Kategori"].cat.categories)
+
+
+def _timestamp(value):
+    return None if value is None else pd.Timestamp(value).normalize()
+
+
+def _discard(entries):
+    # Dipanggil di luar lock: membersihkan hasil (mis. menghapus file) bisa lambat
+    for value, discard in entries:
+        if discard is not None:
+            discard(value)
+
+
+# =======================================================================================
+# QUERY & PAGINASI
+# =======================================================================================
+def filter_transactions(frame, akun=None, kategori=None, nominal_min=None, nominal_max=None):
+    """Saring transaksi berdasarkan daftar akun, kategori (kosong = semua) dan nominal.
+
+    Nominal satu baris adalah Debit + Kredit (salah satunya biasanya 0); batas None
+    berarti tidak dibatasi.
+    """
+    masks = []
+    if akun:
+        masks.append(frame["Akun"].isin(akun))
+    if kategori:
+        masks.append(frame["Kategori"].isin(kategori))
+    if nominal_min is not None or nominal_max is not None:
+        nominal = frame["Debit"] + frame["Kredit"]
+        if nominal_min is not None:
+            masks.append(nominal >= nominal_min)
+        if nominal_max is not None:
+            masks.append(nominal <= nominal_max)
+    if not masks:
+        return frame
+    mask = masks[0]
+    for other in masks[1:]:
+        mask &= other
+    return frame[mask]
+
+
+def page_slice(frame, sort_by="Tanggal", ascending=True, page=1, page_size=50):
+    """Urutkan di server lalu ambil satu halaman.
+
+    Yang dikirim ke browser hanya `page_size` baris, berapa pun besar ledger-nya.
+    """
+    if sort_by:
+        # Urutan stabil (mergesort) supaya baris bertanggal sama tetap urut sesuai id
+        frame = frame.sort_values(sort_by, ascending=ascending, kind="mergesort")
+    start = (page - 1) * page_size
+    return frame.iloc[start:start + page_size]
+
+
+# =======================================================================================
+# EDIT MASSAL (GRID)
+# =======================================================================================
+def editor_changes(ledger, ids, delta, kategori_map):
+    """Ubah delta `st.data_editor` menjadi (updates, inserts, deletes) untuk `apply_changes`.
+
+    `ids` adalah id baris sesuai posisi di grid. Baris yang diedit dibandingkan dengan data
+    tersimpan; edit yang hasilnya sama diabaikan, jadi hanya baris yang benar-benar
+    berubah yang ditulis. Nilai tidak valid menghasilkan ValueError.
+    """
+    deletes = [ids[pos] for pos in delta.get("deleted_rows", [])]
+
+    updates = {}
+    for pos, values in delta.get("edited_rows", {}).items():
+        row_id = ids[int(pos)]
+        if row_id in deletes:
+            continue
+        try:
+            stored = normalize_row(ledger.row(row_id))
+        except KeyError:
+            raise LedgerConflict(row_id) from None
+        merged = {**stored, **values}
+        if "Akun" in values:
+            # Kategori selalu mengikuti chart of accounts untuk akun yang baru dipilih
+            merged["Kategori"] = kategori_map.get(values["Akun"])
+        row = _editor_row(merged, kategori_map, f"ID {row_id}")
+        if row != stored:
+            updates[row_id] = row
+
+    inserts = []
+    for n, values in enumerate(delta.get("added_rows", []), start=1):
+        if all(v is None or v == "" for v in values.values()):
+            continue  # baris baru yang dibiarkan kosong
+        values = {**values, "Kategori": kategori_map.get(values.get("Akun"))}
+        inserts.append(_editor_row(values, kategori_map, f"Baris baru {n}"))
+
+    return updates, inserts, deletes
+
+
+def _editor_row(values, kategori_map, label):
+    # Sel kosong tidak ikut di `added_rows` st.data_editor; isi default untuk kolom opsional
+    values = {**values, "Deskripsi": values.get("Deskripsi") or ""}
+    if values.get("Akun") in (None, ""):
+        raise ValueError(f"{label}: akun wajib diisi.")
+    if values.get("Akun") not in kategori_map:
+        raise ValueError(f"{label}: akun '{values.get('Akun')}' tidak ada di chart of accounts.")
+    if values.get("Tanggal") in (None, ""):
+        raise ValueError(f"{label}: tanggal wajib diisi.")
+    for col in ("Debit", "Kredit"):
+        value = values.get(col) or 0
+        if value < 0 or value != int(value):
+            raise ValueError(f"{label}: {col} harus bilangan bulat tidak negatif.")
+        values[col] = int(value)
+    return normalize_row(values)
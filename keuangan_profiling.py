@@ -0,0 +1,146 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# Log lokal untuk analisis offline (satu baris JSON per rerun)
+PROFILE_LOG = os.environ.get("KEUANGAN_PROFILE_LOG", "keuangan_profile.jsonl")
+
+# Setiap rerun skrip Streamlit berjalan di thread-nya sendiri, jadi profil aktif disimpan
+# per thread. Tanpa profil aktif, `section` dan `profiled` tidak mengukur apa pun.
+_local = threading.local()
+
+# tracemalloc berlaku untuk seluruh proses: dinyalakan oleh profil memori pertama dan baru
+# dimatikan setelah profil memori terakhir (dari sesi mana pun) selesai. Angkanya juga
+# mencakup alokasi sesi lain yang berjalan bersamaan.
+_tracing_lock = threading.Lock()
+_tracing_users = 0         # profil memori yang sedang aktif
+_tracing_started = False   # True jika tracemalloc dinyalakan di sini, bukan dari luar
+
+
+# =======================================================================================
+# PROFIL SATU RERUN
+# =======================================================================================
+class RerunProfile:
+    """Catatan waktu (dan opsional memori) setiap bagian dalam satu rerun."""
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.records = []  # dict: name, depth, ms, mem_kb
+        self.started = time.perf_counter()
+        self.total_ms = None
+        self.peak_kb = None
+        self._depth = 0
+
+    def as_rows(self):
+        return [
+            {
+                "Bagian": "  " * r["depth"] + r["name"],
+                "Durasi (ms)": round(r["ms"], 2),
+                "Memori proses (KB)": None if r["mem_kb"] is None else round(r["mem_kb"], 1),
+            }
+            for r in self.records
+        ]
+
+
+def start_rerun(memory=False):
+    profile = RerunProfile(memory=memory)
+    if memory:
+        _acquire_tracing()
+    _local.profile = profile
+    return profile
+
+
+def active_profile():
+    """Profil rerun yang sedang aktif di thread ini (None jika profiling tidak aktif)."""
+    return getattr(_local, "profile", None)
+
+
+def finish_rerun():
+    """Tutup profil rerun di thread ini dan kembalikan hasilnya (None jika tidak aktif)."""
+    profile = getattr(_local, "profile", None)
+    _local.profile = None
+    if profile is None:
+        return None
+    profile.total_ms = (time.perf_counter() - profile.started) * 1000
+    if profile.memory:
+        # Puncak memori seluruh proses sejak tracing dinyalakan
+        profile.peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+        _release_tracing()
+    return profile
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+@contextmanager
+def section(name):
+    """Ukur satu blok kode jika profiling aktif di rerun ini."""
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        yield
+        return
+
+    record = {"name": name, "depth": profile._depth, "ms": 0.0, "mem_kb": None}
+    profile.records.append(record)
+    mem_before = tracemalloc.get_traced_memory()[0] if profile.memory else None
+    profile._depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["ms"] = (time.perf_counter() - start) * 1000
+        profile._depth -= 1
+        if mem_before is not None:
+            record["mem_kb"] = (tracemalloc.get_traced_memory()[0] - mem_before) / 1024
+
+
+def profiled(name=None):
+    """Dekorator: bungkus fungsi dengan `section` (nama default = nama fungsi)."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "profile", None) is None:
+                return func(*args, **kwargs)
+            with section(label):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def append_log(profile, path=None, **meta):
+    """Tambahkan satu baris JSON (ringkasan rerun + `meta`) ke log lokal."""
+    record = {
+        "waktu": datetime.now().isoformat(timespec="seconds"),
+        "total_ms": round(profile.total_ms, 3),
+        "peak_kb": None if profile.peak_kb is None else round(profile.peak_kb, 1),
+        "bagian": [
+            {k: (round(v, 3) if isinstance(v, float) else v) for k, v in r.items()}
+            for r in profile.records
+        ],
+        **meta,
+    }
+    with open(path or PROFILE_LOG, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
@@ -0,0 +1,314 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pandas as pd
+
+# =======================================================================================
+# KONFIGURASI DATABASE
+# =======================================================================================
+DB_PATH = os.environ.get("KEUANGAN_DB", "keuangan.db")
+
+COLUMNS = ["Tanggal", "Deskripsi", "Akun", "Kategori", "Debit", "Kredit"]
+
+# Chart of Accounts defaults (dipakai saat database masih kosong, bisa diubah lewat UI)
+DEFAULT_KATEGORI_MAP = {
+    "Kas": "Aset",
+    "Bank": "Aset",
+    "Piutang": "Aset",
+    "Persediaan": "Aset",
+    "Peralatan": "Aset",
+    "Utang": "Kewajiban",
+    "Beban": "Beban",       # treat Beban as its own category (for L/R later)
+    "Modal": "Ekuitas",
+    "Pendapatan": "Pendapatan"  # treat Pendapatan as its own category
+}
+
+# Derive from kategori_map values (unique) + some sensible defaults
+DEFAULT_KATEGORI_LIST = sorted(list(set(DEFAULT_KATEGORI_MAP.values()) | {"Aset", "Kewajiban", "Ekuitas", "Beban", "Pendapatan", "Lainnya"}))
+
+# Nama kolom di DataFrame -> nama kolom di tabel SQLite
+_SQL_COLUMNS = {
+    "Tanggal": "tanggal",
+    "Deskripsi": "deskripsi",
+    "Akun": "akun",
+    "Kategori": "kategori",
+    "Debit": "debit",
+    "Kredit": "kredit",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transaksi (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    tanggal   TEXT    NOT NULL,
+    deskripsi TEXT    NOT NULL DEFAULT '',
+    akun      TEXT    NOT NULL,
+    kategori  TEXT    NOT NULL,
+    debit     INTEGER NOT NULL DEFAULT 0,
+    kredit    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_transaksi_tanggal ON transaksi (tanggal);
+CREATE INDEX IF NOT EXISTS idx_transaksi_akun ON transaksi (akun, tanggal);
+
+CREATE TABLE IF NOT EXISTS akun (
+    posisi   INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama     TEXT NOT NULL UNIQUE,
+    kategori TEXT NOT NULL,
+    induk    TEXT  -- nama akun induk (NULL = akun tingkat teratas)
+);
+
+CREATE TABLE IF NOT EXISTS kategori (
+    nama TEXT PRIMARY KEY
+);
+
+-- Penutupan periode: transaksi s.d. `tanggal` dibekukan, saldo per akun disimpan
+CREATE TABLE IF NOT EXISTS penutupan (
+    tanggal      TEXT PRIMARY KEY,
+    ditutup_pada TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS saldo_penutupan (
+    tanggal  TEXT    NOT NULL REFERENCES penutupan (tanggal),
+    kategori TEXT    NOT NULL,
+    akun     TEXT    NOT NULL,
+    debit    INTEGER NOT NULL,
+    kredit   INTEGER NOT NULL,
+    PRIMARY KEY (tanggal, kategori, akun)
+);
+"""
+
+
+def _to_sql_row(row):
+    """Ubah satu baris transaksi (dict dengan kolom COLUMNS) ke tuple untuk SQLite."""
+    tanggal = row["Tanggal"]
+    if isinstance(tanggal, datetime):  # termasuk pd.Timestamp
+        tanggal = tanggal.date().isoformat()
+    elif isinstance(tanggal, date):
+        tanggal = tanggal.isoformat()
+    else:
+        tanggal = pd.Timestamp(tanggal).date().isoformat()
+    return (
+        tanggal,
+        row["Deskripsi"] or "",
+        row["Akun"],
+        row["Kategori"],
+        int(row["Debit"]),
+        int(row["Kredit"]),
+    )
+
+
+# =======================================================================================
+# LEDGER STORE (SQLITE)
+# =======================================================================================
+class LedgerStore:
+    """Penyimpanan transaksi dan chart of accounts di SQLite (mode WAL).
+
+    Satu koneksi dipakai bersama oleh semua thread Streamlit, sehingga setiap akses
+    dibungkus lock. Penulisan selalu dikelompokkan dalam satu transaksi database.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self):
+        # Database lama dibuat sebelum akun bisa bersarang
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(akun)")}
+        if "induk" not in columns:
+            with self._write() as conn:
+                conn.execute("ALTER TABLE akun ADD COLUMN induk TEXT")
+
+    @contextmanager
+    def _write(self):
+        # "with conn" = BEGIN ... COMMIT (atau ROLLBACK jika terjadi error)
+        with self._lock, self._conn:
+            yield self._conn
+
+    # -----------------------------------------------------------------------------------
+    # Transaksi
+    # -----------------------------------------------------------------------------------
+    def insert_many(self, rows):
+        """Simpan banyak baris dalam satu transaksi; kembalikan id masing-masing baris."""
+        with self._write() as conn:
+            return self._insert(conn, rows)
+
+    def apply_changes(self, updates, inserts, deletes, restores=None):
+        """Edit (dict id -> baris), tambah dan hapus sekaligus dalam satu transaksi.
+
+        `restores` (dict id -> baris) mengembalikan baris yang pernah dihapus dengan id
+        lamanya (untuk undo). Kembalikan id baris yang ditambahkan.
+        """
+        with self._write() as conn:
+            if updates:
+                conn.executemany(
+                    "UPDATE transaksi SET tanggal = ?, deskripsi = ?, akun = ?, kategori = ?, "
+                    "debit = ?, kredit = ? WHERE id = ?",
+                    [_to_sql_row(row) + (int(row_id),) for row_id, row in updates.items()],
+                )
+            if deletes:
+                conn.executemany(
+                    "DELETE FROM transaksi WHERE id = ?", [(int(i),) for i in deletes]
+                )
+            if restores:
+                # Id lama selalu <= sqlite_sequence, jadi urutan id insert baru tidak terganggu
+                conn.executemany(
+                    "INSERT INTO transaksi (id, tanggal, deskripsi, akun, kategori, debit, kredit) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(int(row_id),) + _to_sql_row(row) for row_id, row in restores.items()],
+                )
+            return self._insert(conn, inserts) if inserts else []
+
+    def _insert(self, conn, rows):
+        rows = [_to_sql_row(row) for row in rows]
+        # AUTOINCREMENT memberi id berurutan setelah nilai sqlite_sequence,
+        # dan lock penulisan menjamin tidak ada insert lain di antaranya
+        start = self._last_id(conn)
+        conn.executemany(
+            "INSERT INTO transaksi (tanggal, deskripsi, akun, kategori, debit, kredit) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        end = self._last_id(conn)
+        if end - start != len(rows):
+            raise sqlite3.DatabaseError("Urutan id transaksi tidak berurutan.")
+        return list(range(start + 1, end + 1))
+
+    @staticmethod
+    def _last_id(conn):
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'transaksi'").fetchone()
+        return row[0] if row else 0
+
+    def load(self):
+        """Ambil semua transaksi sebagai DataFrame ber-index id, urut id."""
+        select = ", ".join(f"{_SQL_COLUMNS[c]} AS \"{c}\"" for c in COLUMNS)
+        sql = f"SELECT id, {select} FROM transaksi ORDER BY id"
+
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, index_col="id")
+        df.index.name = None
+        df["Tanggal"] = pd.to_datetime(df["Tanggal"], format="ISO8601")
+        return df
+
+    def iter_chunks(self, chunk_rows=10_000):
+        """Baca seluruh transaksi per potongan (list of tuple), urut sesuai id.
+
+        Memakai koneksi baca tersendiri: di mode WAL pembacaan ini melihat snapshot
+        yang konsisten dan tidak menahan lock penulisan selama export berjalan.
+        """
+        columns = ", ".join(_SQL_COLUMNS[c] for c in COLUMNS)
+        conn = sqlite3.connect(self.path)
+        try:
+            cur = conn.execute(f"SELECT {columns} FROM transaksi ORDER BY id")
+            while True:
+                rows = cur.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+    # -----------------------------------------------------------------------------------
+    # Chart of accounts
+    # -----------------------------------------------------------------------------------
+    def init_chart(self, kategori_map, kategori_list):
+        """Isi chart of accounts default jika database masih kosong."""
+        with self._write() as conn:
+            if conn.execute("SELECT EXISTS (SELECT 1 FROM akun)").fetchone()[0]:
+                return
+            conn.executemany(
+                "INSERT INTO akun (nama, kategori) VALUES (?, ?)", list(kategori_map.items())
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO kategori (nama) VALUES (?)", [(k,) for k in kategori_list]
+            )
+
+    def load_accounts(self):
+        """Kembalikan dict akun -> kategori sesuai urutan penambahan."""
+        with self._lock:
+            rows = self._conn.execute("SELECT nama, kategori FROM akun ORDER BY posisi").fetchall()
+        return dict(rows)
+
+    def load_categories(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT nama FROM kategori ORDER BY rowid").fetchall()
+        return [r[0] for r in rows]
+
+    def load_parents(self):
+        """Kembalikan dict sub-akun -> akun induk."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT nama, induk FROM akun WHERE induk IS NOT NULL ORDER BY posisi"
+            ).fetchall()
+        return dict(rows)
+
+    def save_account(self, nama, kategori, induk=None):
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO akun (nama, kategori, induk) VALUES (?, ?, ?)", (nama, kategori, induk)
+            )
+            conn.execute("INSERT OR IGNORE INTO kategori (nama) VALUES (?)", (kategori,))
+
+    def set_parent(self, nama, induk):
+        with self._write() as conn:
+            conn.execute("UPDATE akun SET induk = ? WHERE nama = ?", (induk, nama))
+
+    def delete_account(self, nama):
+        with self._write() as conn:
+            conn.execute("DELETE FROM akun WHERE nama = ?", (nama,))
+
+    def save_category(self, nama):
+        with self._write() as conn:
+            conn.execute("INSERT OR IGNORE INTO kategori (nama) VALUES (?)", (nama,))
+
+    # -----------------------------------------------------------------------------------
+    # Penutupan periode
+    # -----------------------------------------------------------------------------------
+    def save_closing(self, tanggal, table):
+        """Simpan penutupan s.d. `tanggal` beserta saldo per (Kategori, Akun) sekaligus."""
+        tanggal = pd.Timestamp(tanggal).date().isoformat()
+        rows = [
+            (tanggal, kategori, akun, int(debit), int(kredit))
+            for kategori, akun, debit, kredit in zip(
+                table["Kategori"], table["Akun"], table["Debit"], table["Kredit"]
+            )
+        ]
+        with self._write() as conn:
+            conn.execute(
+                "INSERT INTO penutupan (tanggal, ditutup_pada) VALUES (?, ?)",
+                (tanggal, datetime.now().isoformat(timespec="seconds")),
+            )
+            conn.executemany(
+                "INSERT INTO saldo_penutupan (tanggal, kategori, akun, debit, kredit) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def load_closings(self):
+        """Daftar (tanggal, ditutup_pada, DataFrame saldo per akun), urut tanggal."""
+        with self._lock:
+            closings = self._conn.execute(
+                "SELECT tanggal, ditutup_pada FROM penutupan ORDER BY tanggal"
+            ).fetchall()
+            saldo = pd.read_sql_query(
+                "SELECT tanggal, kategori AS Kategori, akun AS Akun, debit AS Debit, "
+                "kredit AS Kredit FROM saldo_penutupan ORDER BY tanggal, kategori, akun",
+                self._conn,
+            )
+        per_tanggal = dict(tuple(saldo.groupby("tanggal", sort=False)))
+        result = []
+        for tanggal, ditutup_pada in closings:
+            table = per_tanggal.get(tanggal, saldo.iloc[:0]).drop(columns="tanggal")
+            table = table.assign(Saldo=table["Debit"] - table["Kredit"]).reset_index(drop=True)
+            result.append((pd.Timestamp(tanggal), ditutup_pada, table))
+        return result
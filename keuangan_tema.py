@@ -0,0 +1,84 @@
+import argparse
+import os
+from pathlib import Path
+
+# File di folder `static/` (di samping skrip aplikasi) disajikan Streamlit di URL
+# app/static/<nama> jika server.enableStaticServing aktif (lihat .streamlit/config.toml).
+# Browser meng-cache-nya, jadi CSS dan gambar tidak ikut dikirim di setiap rerun.
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+STATIC_URL = "app/static"
+STYLESHEET = "keuangan.css"
+# Salinan lokal foto sidebar, dibuat dengan `python keuangan_tema.py foto.jpg` dari foto
+# Unsplash yang dipakai keuangan.css (photo-1527430253228-e93688616381)
+SIDEBAR_IMAGE = "sidebar.webp"
+
+# Sidebar Streamlit lebarnya ~300px; dua kali lipat supaya tetap tajam di layar HiDPI
+SIDEBAR_SIZE = (600, 1200)
+SIDEBAR_QUALITY = 70
+
+
+# =======================================================================================
+# INJEKSI STYLE
+# =======================================================================================
+# Elemen Streamlit yang tidak ditulis ulang akan hilang di rerun berikutnya, tetapi <link>
+# yang ditambahkan ke <head> tetap ada. Karena itu skrip kecil ini cukup dikirim sekali
+# per sesi; `?v=` memaksa browser memuat ulang CSS setelah file-nya diubah.
+_LINK_SCRIPT = """
+<script>
+if (!document.getElementById("keuangan-css")) {
+    const link = document.createElement("link");
+    link.id = "keuangan-css";
+    link.rel = "stylesheet";
+    link.href = "%s";
+    document.head.appendChild(link);
+}
+</script>
+"""
+
+
+def inject_styles():
+    """Pasang CSS aplikasi (termasuk gambar sidebar lokal) sekali per sesi."""
+    # Streamlit diimport di sini agar modul ini (dan CLI gambar) bisa dipakai tanpa memuatnya
+    import streamlit as st
+
+    if not st.get_option("server.enableStaticServing"):
+        # Tanpa static serving CSS harus dikirim inline di setiap rerun
+        st.html(STATIC_DIR / STYLESHEET)
+        return
+
+    if st.session_state.get("tema_terpasang"):
+        return
+    version = int((STATIC_DIR / STYLESHEET).stat().st_mtime)
+    st.html(_LINK_SCRIPT % f"{STATIC_URL}/{STYLESHEET}?v={version}", unsafe_allow_javascript=True)
+    st.session_state.tema_terpasang = True
+
+
+# =======================================================================================
+# ASET GAMBAR
+# =======================================================================================
+def optimize_image(source, target=None, size=SIDEBAR_SIZE, quality=SIDEBAR_QUALITY):
+    """Potong dan kecilkan foto menjadi WebP seukuran sidebar (mengganti gambar bawaan)."""
+    # Pillow hanya dibutuhkan saat menyiapkan aset, bukan saat aplikasi berjalan
+    from PIL import Image, ImageOps
+
+    target = target or STATIC_DIR / SIDEBAR_IMAGE
+    with Image.open(source) as image:
+        image = ImageOps.fit(ImageOps.exif_transpose(image).convert("RGB"), size)
+        image.save(target, "WEBP", quality=quality, method=6)
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Siapkan gambar sidebar dari sebuah foto.")
+    parser.add_argument("source", help="file foto (JPEG/PNG/WebP)")
+    parser.add_argument("--output", help=f"default: static/{SIDEBAR_IMAGE}")
+    parser.add_argument("--quality", type=int, default=SIDEBAR_QUALITY)
+    args = parser.parse_args(argv)
+
+    target = optimize_image(args.source, args.output, quality=args.quality)
+    print(f"{target}: {os.path.getsize(target) / 1024:.1f} KB")
+    print(f"Ganti url gambar sidebar di static/{STYLESHEET} menjadi \"{SIDEBAR_IMAGE}\".")
+
+
+if __name__ == "__main__":
+    main()
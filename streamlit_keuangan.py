@@ -1,189 +1,256 @@
+import functools
+from datetime import date
+
 import streamlit as st
 import pandas as pd
-from io import BytesIO
+
+from keuangan_export import (
+    export_account_ledgers, export_arrow, export_csv, export_excel, export_parquet, export_report
+)
+from keuangan_import import import_file
+from keuangan_index import category_totals
+from keuangan_jobs import GAGAL, SELESAI, JobManager
+from keuangan_journal import UndoJournal
+from keuangan_laporan import (
+    BEBAN, PENDAPATAN, income_statement, neraca_totals, net_income, trial_balance
+)
+from keuangan_ledger import (
+    Ledger, LedgerConflict, PeriodClosed, editor_changes, filter_transactions, page_slice
+)
+from keuangan_profiling import (
+    active_profile, append_log, finish_rerun, profiled, start_rerun
+)
+from keuangan_store import DB_PATH, DEFAULT_KATEGORI_LIST, DEFAULT_KATEGORI_MAP, LedgerStore
+from keuangan_tema import inject_styles
 
 # =======================================================================================
 # KONFIGURASI APLIKASI
 # =======================================================================================
 st.set_page_config(page_title="Laporan Keuangan", layout="wide")
-# =======================================================================================
 
-st.markdown("""
-<style>
-section[data-testid="stSidebar"] {
-    background-image: url("https://images.unsplash.com/photo-1527430253228-e93688616381");
-    //background-color: #f5f7fa;
-    background-size: cover;
-    background-position: center;
-}
-</style>
-""", unsafe_allow_html=True)
+# User yang boleh menyalakan panel profiling di sidebar
+PROFILING_USERS = {"admin"}
 
-# CUSTOM DESIGN (CSS)
-# =======================================================================================
-st.markdown("""
-<style>
+# Rincian rerun fragment yang ditampilkan panel profiling pada rerun penuh berikutnya
+FRAGMENT_PROFILE_LIMIT = 10
 
-html, body, [class*="css"] {
-    font-family: 'Segoe UI', sans-serif;
-}
+def profiling_enabled():
+    # Nilai toggle dibaca dari session state (hasil interaksi sebelum rerun ini)
+    return (
+        st.session_state.get("profiling_aktif")
+        and st.session_state.get("current_user") in PROFILING_USERS
+    )
 
-/* Background halaman */
-main {
-    background-color: #f5f7fa;
-}
+# Profiling dimulai sedini mungkin agar seluruh rerun ikut terukur
+if profiling_enabled():
+    start_rerun(memory=st.session_state.get("profiling_memori", False))
 
-/* Card style */
-.card {
-    padding: 20px;
-    background-color: white;
-    border-radius: 12px;
-    box-shadow: 0px 4px 14px rgba(0,0,0,0.08);
-    margin-bottom: 20px;
-}
+# CSS dan gambar sidebar disajikan sebagai file statis lokal (static/), dipasang sekali per sesi
+inject_styles()
 
-/* Title */
-.big-title {
-    font-size: 32px;
-    font-weight: 700;
-    color: #1ABC9C;
-    margin-bottom: 10px;
+USERS = {
+    "admin": "123",
+    "user1": "abc",
+    "keuangan": "finance123",
+    "bos": "super123"
 }
 
-/* Subheader styling */
-h2, h3, h4 {
-    color: #374151 !important;
-    margin-top: 20px;
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Label tombol -> (fungsi export, nama file, mime, keterangan)
+EXPORT_JOBS = {
+    "Excel": (export_excel, "laporan_keuangan.xlsx", XLSX_MIME, None),
+    "CSV": (export_csv, "laporan_keuangan.csv", "text/csv", None),
+    "Parquet": (export_parquet, "laporan_keuangan.parquet", "application/vnd.apache.parquet", None),
+    "Arrow": (export_arrow, "laporan_keuangan.arrow", "application/vnd.apache.arrow.file", None),
+    "Laporan Lengkap (Excel)": (
+        export_report, "laporan_keuangan_lengkap.xlsx", XLSX_MIME,
+        "Neraca, Neraca Saldo, Buku Besar per akun (dengan saldo berjalan) dan Jurnal."
+    ),
+    "Buku Besar Semua Akun (ZIP)": (
+        export_account_ledgers, "buku_besar_semua_akun.zip", "application/zip",
+        "Satu file Excel buku besar per akun (seluruh periode), dikumpulkan dalam satu ZIP."
+    ),
 }
 
-/* Sidebar */
-section[data-testid="stSidebar"] {
-    background-color: #1ABC9C;
-    color: white;
-}
-section[data-testid="stSidebar"] * {
-    color: black !important;
-}
+# Interval (detik) pembaruan progress selama ada job export yang berjalan
+JOB_POLL_SECONDS = 1
 
-/* Button custom */
-div.stButton > button {
-    background-color: #1ABC9C;
-    color: white;
-    border-radius: 8px;
-    padding: 0.6rem 1rem;
-    border: none;
-}
+# Pilihan jumlah baris per halaman di Daftar Transaksi
+PAGE_SIZES = [25, 50, 100, 250]
 
-div.stButton > button:hover {
-    background-color: #1b38b1;
-    color: black;
-}
+# Baris per halaman rincian buku besar semua akun
+RINCIAN_PAGE_SIZE = 100
 
-/* Input focus */
-input:focus, select:focus, textarea:focus {
-    border: 2px solid #1ABC9C !important;
-}
+NAMA_BULAN = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
 
-/* Table styling */
-[data-testid="stDataFrame"] div {
-    border-radius: 10px;
-}
+# Pilihan periode untuk filter rentang tanggal (Daftar Transaksi dan Buku Besar)
+PILIHAN_PERIODE = ["Semua", "Bulan ini", "Tahun ini", "Pilih rentang"]
 
-</style>
-""", unsafe_allow_html=True)
+# Kolom Tanggal bertipe datetime64; tampilkan tanpa jam
+TANGGAL_COLUMN = {"Tanggal": st.column_config.DateColumn("Tanggal", format="YYYY-MM-DD")}
+
+def indent_akun(akun, tingkat):
+    """Nama akun dengan indentasi sesuai tingkatnya di pohon chart of accounts."""
+    return "\u2003" * tingkat + ("└ " if tingkat else "") + akun
+
+# =======================================================================================
+# PENYIMPANAN (SQLITE)
+# =======================================================================================
+@st.cache_resource
+def get_store():
+    store = LedgerStore(DB_PATH)
+    store.init_chart(DEFAULT_KATEGORI_MAP, DEFAULT_KATEGORI_LIST)
+    return store
+
+# Satu ledger dan satu chart of accounts untuk seluruh proses, dipakai bersama semua sesi
+# (semua user melihat transaksi yang sama; memori tidak bertambah per user yang login)
+@st.cache_resource
+def get_ledger():
+    return Ledger(get_store())
+
+# Pool thread untuk export di latar belakang, dibagi semua sesi (jumlah worker terbatas)
+@st.cache_resource
+def get_jobs():
+    return JobManager()
 
-USERS = {
-    "admin": "123",
-    "user1": "abc",
-    "keuangan": "finance123",
-    "bos": "super123"
-}
 # =======================================================================================
 # INISIALISASI SESSION STATE
 # =======================================================================================
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 
-if "data" not in st.session_state:
-    st.session_state.data = pd.DataFrame(
-        columns=["Tanggal", "Deskripsi", "Akun", "Kategori", "Debit", "Kredit"]
-    )
+if "editor_seq" not in st.session_state:
+    st.session_state.editor_seq = 0  # dinaikkan untuk mengosongkan grid edit massal
 
-if "edit_index" not in st.session_state:
-    st.session_state.edit_index = None
-
-# Chart of Accounts defaults (bisa diubah lewat UI)
-if "akun_list" not in st.session_state:
-    st.session_state.akun_list = [
-        "Kas", "Bank", "Piutang", "Persediaan", "Peralatan",
-        "Utang", "Beban", "Modal", "Pendapatan"
-    ]
+# Id job export (keuangan_jobs) milik sesi ini, urut waktu dibuat
+if "export_jobs" not in st.session_state:
+    st.session_state.export_jobs = []
 
-if "kategori_map" not in st.session_state:
-    st.session_state.kategori_map = {
-        "Kas": "Aset",
-        "Bank": "Aset",
-        "Piutang": "Aset",
-        "Persediaan": "Aset",
-        "Peralatan": "Aset",
-        "Utang": "Kewajiban",
-        "Beban": "Beban",       # treat Beban as its own category (for L/R later)
-        "Modal": "Ekuitas",
-        "Pendapatan": "Pendapatan"  # treat Pendapatan as its own category
-    }
+# Riwayat undo/redo per sesi: hanya delta baris yang diubah sesi ini
+if "journal" not in st.session_state:
+    st.session_state.journal = UndoJournal()
 
-if "kategori_list" not in st.session_state:
-    # Derive from kategori_map values (unique) + some sensible defaults
-    st.session_state.kategori_list = sorted(list(set(st.session_state.kategori_map.values()) | {"Aset", "Kewajiban", "Ekuitas", "Beban", "Pendapatan", "Lainnya"}))
+if "edit_index" not in st.session_state:
+    st.session_state.edit_index = None
+    st.session_state.edit_version = None
 
 # =======================================================================================
 # FUNGSI CHART OF ACCOUNTS
 # =======================================================================================
-def add_account(account_name: str, kategori: str):
+# Chart of accounts dipegang ledger bersama (lihat keuangan_akun), sehingga akun baru
+# langsung terlihat di semua sesi dan jumlah pemakaian akun ikut setiap mutasi transaksi
+def add_account(account_name: str, kategori: str, induk=None):
     account_name = account_name.strip()
     if not account_name:
         st.warning("Nama akun tidak boleh kosong.")
         return False
-    if account_name in st.session_state.akun_list:
-        st.warning("Akun sudah ada.")
+    try:
+        get_ledger().add_account(account_name, kategori, induk)
+    except ValueError as e:
+        st.warning(str(e))
         return False
-    st.session_state.akun_list.append(account_name)
-    st.session_state.kategori_map[account_name] = kategori
-    if kategori not in st.session_state.kategori_list:
-        st.session_state.kategori_list.append(kategori)
     st.success(f"Akun '{account_name}' ditambahkan dengan kategori '{kategori}'.")
     return True
 
 def delete_account(account_name: str):
-    # Prevent deletion if account is used in transactions
-    used = account_name in st.session_state.data["Akun"].values
-    if used:
-        st.error("Akun tidak dapat dihapus karena sudah digunakan di transaksi.")
+    # Akun yang sudah dipakai transaksi ditolak (cek lewat jumlah pemakaian, tanpa query)
+    try:
+        get_ledger().delete_account(account_name)
+    except ValueError as e:
+        st.error(str(e))
         return False
-    if account_name in st.session_state.akun_list:
-        st.session_state.akun_list.remove(account_name)
-    if account_name in st.session_state.kategori_map:
-        del st.session_state.kategori_map[account_name]
     st.success(f"Akun '{account_name}' dihapus.")
     return True
 
+def set_parent(account_name: str, induk=None):
+    try:
+        get_ledger().set_parent(account_name, induk)
+    except ValueError as e:
+        st.error(str(e))
+        return False
+    st.success(f"Akun '{account_name}' dipindah ke bawah '{induk}'." if induk else
+               f"Akun '{account_name}' dijadikan akun tingkat teratas.")
+    return True
+
 def add_category(kategori_name: str):
     kategori_name = kategori_name.strip()
     if not kategori_name:
         st.warning("Nama kategori tidak boleh kosong.")
         return False
-    if kategori_name in st.session_state.kategori_list:
-        st.warning("Kategori sudah ada.")
+    try:
+        get_ledger().add_category(kategori_name)
+    except ValueError as e:
+        st.warning(str(e))
         return False
-    st.session_state.kategori_list.append(kategori_name)
     st.success(f"Kategori '{kategori_name}' ditambahkan.")
     return True
 
+# =======================================================================================
+# FRAGMENT & PESAN
+# =======================================================================================
+# Halaman Transaksi dibagi menjadi fragment yang dijalankan ulang sendiri-sendiri: mengisi
+# form atau mengganti filter tabel hanya merender ulang fragment itu. Setelah data ledger
+# berubah, callback memanggil `invalidate` untuk fragment yang menampilkan data tersebut.
+FRAGMENT_INPUT = "fragmen_input"
+FRAGMENT_TABEL = "fragmen_tabel"
+FRAGMENT_EXPORT = "fragmen_export"
+FRAGMENT_RINGKASAN = "fragmen_ringkasan"
+DATA_FRAGMENTS = [FRAGMENT_TABEL, FRAGMENT_EXPORT, FRAGMENT_RINGKASAN]
+
+def fragment(key):
+    """`st.fragment(key=...)` yang juga terukur saat fragment dijalankan ulang sendirian.
+
+    Rerun fragment tidak melewati `start_rerun` di awal skrip, jadi profilnya dimulai dan
+    ditutup di sini. Hasilnya ditampilkan panel profiling pada rerun penuh berikutnya.
+    """
+    def decorator(func):
+        body = profiled()(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Rerun penuh: fragment tercatat sebagai bagian dari profil rerun itu
+            if active_profile() is not None or not profiling_enabled():
+                return body(*args, **kwargs)
+            start_rerun(memory=st.session_state.get("profiling_memori", False))
+            try:
+                return body(*args, **kwargs)
+            finally:
+                _record_fragment_profile(key, finish_rerun())
+
+        return st.fragment(key=key)(wrapper)
+    return decorator
+
+def _record_fragment_profile(key, profile):
+    profiles = st.session_state.setdefault("profil_fragment", [])
+    profiles.append((key, profile))
+    del profiles[:-FRAGMENT_PROFILE_LIMIT]
+    if st.session_state.get("profiling_log"):
+        append_log(profile, halaman=menu, user=st.session_state.get("current_user"),
+                   fragment=key)
+
+def invalidate(*fragments):
+    """Jalankan ulang hanya fragment yang disebut (hanya boleh dari callback widget)."""
+    st.rerun(list(fragments))
+
+def flash(key, kind, text):
+    # Callback berjalan sebelum rerun, jadi pesannya disimpan dan ditampilkan oleh fragment
+    st.session_state[key] = (kind, text)
+
+def show_flash(key):
+    if key in st.session_state:
+        kind, text = st.session_state.pop(key)
+        getattr(st, kind)(text)
+
 # =======================================================================================
 # FUNGSI DATA (TRANSAKSI)
 # =======================================================================================
-def add_transaction(tanggal, deskripsi, akun, kategori, debit, kredit):
-    new_row = {
+# Index transaksi = id baris di SQLite, sehingga tetap stabil setelah hapus.
+def _make_row(tanggal, deskripsi, akun, kategori, debit, kredit):
+    return {
         "Tanggal": tanggal,
         "Deskripsi": deskripsi,
         "Akun": akun,
@@ -191,28 +258,164 @@ def add_transaction(tanggal, deskripsi, akun, kategori, debit, kredit):
         "Debit": debit,
         "Kredit": kredit,
     }
-    st.session_state.data = pd.concat(
-        [st.session_state.data, pd.DataFrame([new_row])],
-        ignore_index=True
+
+@profiled()
+def add_transaction(tanggal, deskripsi, akun, kategori, debit, kredit):
+    return get_ledger().add(
+        _make_row(tanggal, deskripsi, akun, kategori, debit, kredit),
+        journal=st.session_state.journal
     )
 
-def update_transaction(index, tanggal, deskripsi, akun, kategori, debit, kredit):
-    st.session_state.data.loc[index] = [tanggal, deskripsi, akun, kategori, debit, kredit]
+@profiled()
+def add_transactions(rows):
+    # Untuk input massal: satu transaksi database, tanpa concat per baris
+    return get_ledger().add_many(rows, journal=st.session_state.journal)
+
+# Keduanya melempar LedgerConflict jika baris sudah diubah/dihapus user lain,
+# dan (seperti tambah transaksi) PeriodClosed untuk tanggal di periode yang sudah ditutup
+@profiled()
+def update_transaction(index, tanggal, deskripsi, akun, kategori, debit, kredit, expected_version=None):
+    get_ledger().update(
+        index, _make_row(tanggal, deskripsi, akun, kategori, debit, kredit),
+        expected_version=expected_version, journal=st.session_state.journal
+    )
 
+@profiled()
 def delete_transaction(index):
-    st.session_state.data = st.session_state.data.drop(index).reset_index(drop=True)
+    get_ledger().delete(index, journal=st.session_state.journal)
+
+@profiled()
+def undo_transaction():
+    st.session_state.journal.undo(get_ledger())
+
+@profiled()
+def redo_transaction():
+    st.session_state.journal.redo(get_ledger())
+
+def undo_controls():
+    """Tombol Undo/Redo untuk perubahan yang dibuat sesi ini."""
+    journal = st.session_state.journal
+    show_flash("pesan_undo")
+
+    col_u1, col_u2, _ = st.columns([1, 1, 6])
+    actions = [
+        (col_u1, "↶", "Undo", journal.can_undo, journal.undo_label(), undo_transaction),
+        (col_u2, "↷", "Redo", journal.can_redo, journal.redo_label(), redo_transaction),
+    ]
+    for col, icon, nama, available, langkah, action in actions:
+        col.button(
+            f"{icon} {nama}", disabled=not available, help=langkah,
+            on_click=_on_undo, args=(action, nama, langkah)
+        )
+
+def _on_undo(action, nama, langkah):
+    try:
+        action()
+    except LedgerConflict:
+        flash("pesan_undo", "error", f"{nama} gagal: transaksinya sudah diubah user lain sejak itu.")
+    except PeriodClosed as e:
+        flash("pesan_undo", "error", str(e))
+    else:
+        flash("pesan_undo", "info", f"{nama}: {langkah}")
+        st.session_state.edit_index = None
+        invalidate(FRAGMENT_INPUT, *DATA_FRAGMENTS)
 
 # =======================================================================================
-# EXPORT FUNCTION
+# EDIT MASSAL (GRID)
 # =======================================================================================
-def export_excel():
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        st.session_state.data.to_excel(writer, index=False)
-    return output.getvalue()
+EDITOR_COLUMNS = ["Tanggal", "Deskripsi", "Akun", "Kategori", "Debit", "Kredit"]
+
+def batch_editor(ledger, page_df, chart):
+    """Grid edit untuk satu halaman transaksi; semua perubahan disimpan dalam satu batch."""
+    show_flash("pesan_batch")
+
+    # Id dan versi baris dicatat saat grid mulai dipakai. Jika isi halaman berubah (pindah
+    # halaman/filter atau diubah user lain) sementara masih ada edit, edit itu dibatalkan
+    # karena posisi barisnya tidak lagi menunjuk ke transaksi yang sama.
+    ids = list(page_df.index)
+    key = f"editor_transaksi_{st.session_state.editor_seq}"
+    base = st.session_state.get("editor_base")
+    if base is None or base["key"] != key or base["ids"] != ids:
+        if base is not None and base["key"] == key and _has_edits(st.session_state.get(key)):
+            st.warning("Isi halaman berubah; perubahan yang belum disimpan dibatalkan.")
+            st.session_state.editor_seq += 1
+            key = f"editor_transaksi_{st.session_state.editor_seq}"
+        base = {"key": key, "ids": ids, "versions": {i: ledger.row_version(i) for i in ids}}
+        st.session_state.editor_base = base
+
+    view = page_df[EDITOR_COLUMNS].astype({"Akun": str, "Kategori": str})
+    st.data_editor(
+        view,
+        key=key,
+        num_rows="dynamic",
+        column_config={
+            **TANGGAL_COLUMN,
+            "Akun": st.column_config.SelectboxColumn("Akun", options=chart.names(), required=True),
+            "Kategori": st.column_config.TextColumn("Kategori", disabled=True),
+            "Debit": st.column_config.NumberColumn("Debit", min_value=0, step=1, default=0),
+            "Kredit": st.column_config.NumberColumn("Kredit", min_value=0, step=1, default=0),
+        },
+    )
+    st.caption("Kategori baris yang diubah atau ditambahkan diisi otomatis dari Chart of Accounts.")
+
+    delta = st.session_state.get(key) or {}
+    col1, col2, _ = st.columns([2, 2, 6])
+    col1.button(
+        "💾 Simpan Semua Perubahan", disabled=not _has_edits(delta),
+        on_click=_on_batch_save, args=(key,)
+    )
+    col2.button("↩️ Batalkan", disabled=not _has_edits(delta), on_click=_reset_editor)
+
+def _on_batch_save(key):
+    ledger = get_ledger()
+    base = st.session_state.editor_base
+    try:
+        delta = st.session_state.get(key) or {}
+        updates, inserts, deletes = editor_changes(ledger, base["ids"], delta, ledger.chart.kategori_map)
+        if updates or inserts or deletes:
+            ledger.apply_changes(
+                updates, inserts, deletes,
+                expected_versions={i: base["versions"][i] for i in [*updates, *deletes]},
+                journal=st.session_state.journal,
+            )
+    except LedgerConflict:
+        flash("pesan_batch", "error",
+              "Sebagian baris sudah diubah atau dihapus user lain. Batalkan lalu ulangi edit.")
+    except (PeriodClosed, ValueError) as e:
+        flash("pesan_batch", "error", str(e))
+    else:
+        flash("pesan_batch", "success",
+              f"{len(updates)} diubah, {len(inserts)} ditambahkan, {len(deletes)} dihapus.")
+        _reset_editor()
+        invalidate(*DATA_FRAGMENTS)
+
+def _reset_editor():
+    st.session_state.editor_seq += 1
 
-def export_csv():
-    return st.session_state.data.to_csv(index=False).encode("utf-8")
+def _has_edits(delta):
+    return bool(delta) and any(delta.get(k) for k in ("edited_rows", "added_rows", "deleted_rows"))
+
+# =======================================================================================
+# FILTER RENTANG TANGGAL
+# =======================================================================================
+def date_range_filter(key, col_periode, col_rentang):
+    """(awal, akhir) dari pilihan periode; None berarti tanpa batas di sisi itu."""
+    periode = col_periode.selectbox("Periode", PILIHAN_PERIODE, key=f"periode_{key}")
+    today = pd.Timestamp.today().normalize()
+
+    if periode == "Bulan ini":
+        return today.replace(day=1), today + pd.offsets.MonthEnd(0)
+    if periode == "Tahun ini":
+        return today.replace(month=1, day=1), today.replace(month=12, day=31)
+    if periode == "Pilih rentang":
+        rentang = col_rentang.date_input(
+            "Rentang tanggal", value=(today.replace(day=1), today), key=f"rentang_{key}"
+        )
+        # Saat baru satu tanggal dipilih, rentangnya masih terbuka di sisi akhir
+        awal = rentang[0] if len(rentang) > 0 else None
+        akhir = rentang[1] if len(rentang) > 1 else None
+        return awal, akhir
+    return None, None
 
 # =======================================================================================
 # HALAMAN LOGIN
@@ -234,6 +437,7 @@ def login_page():
 # =======================================================================================
 # HALAMAN TRANSAKSI
 # =======================================================================================
+@profiled()
 def transaksi_page():
     if st.button("Logout"):
         st.session_state.logged_in = False
@@ -241,108 +445,324 @@ def transaksi_page():
 
     st.title("📘 Aplikasi Laporan Keuangan (Debit & Kredit)")
 
+    ledger = get_ledger()
+
     # ===============================
     # Input / Edit Form
     # ===============================
+    input_form(ledger)
+
+    # ===============================
+    # Import CSV / Excel
+    # ===============================
+    with st.expander("📥 Import Transaksi (CSV/Excel/Parquet/Arrow)"):
+        st.caption(
+            "Kolom: Tanggal, Deskripsi, Akun, Debit, Kredit (sama dengan hasil export). "
+            "Kategori diisi otomatis dari Chart of Accounts. Satu import bisa dibatalkan "
+            "sekaligus dengan tombol Undo."
+        )
+        uploaded = st.file_uploader(
+            "Pilih file", type=["csv", "xlsx", "parquet", "arrow", "feather"], key="import_file_widget"
+        )
+
+        if uploaded is not None and st.button("Import"):
+            try:
+                added, errors = import_file(
+                    ledger, uploaded, uploaded.name, ledger.chart.kategori_map,
+                    journal=st.session_state.journal
+                )
+            except (PeriodClosed, ValueError) as e:
+                # PeriodClosed: periode ditutup sesi lain selama import; tidak ada yang masuk
+                st.error(str(e))
+            except LedgerConflict:
+                st.error("Data berubah oleh user lain selama import. Tidak ada baris yang "
+                         "masuk; ulangi import.")
+            else:
+                st.success(f"{added} transaksi berhasil diimport.")
+                if not errors.empty:
+                    st.warning(f"{len(errors)} baris dilewati karena tidak valid:")
+                    st.dataframe(errors, hide_index=True)
+                    st.download_button(
+                        label="⬇️ Download Laporan Kesalahan",
+                        data=errors.to_csv(index=False).encode("utf-8"),
+                        file_name="kesalahan_import.csv",
+                        mime="text/csv"
+                    )
+
+    # ===============================
+    # Tabel Data
+    # ===============================
+    st.subheader("📄 Daftar Transaksi")
+    transaction_table(ledger)
+
+    # ===============================
+    # Export Buttons
+    # ===============================
+    export_panel(ledger)
+
+    # ===============================
+    # Ringkasan Saldo
+    # ===============================
+    st.subheader("📊 Ringkasan Saldo")
+    saldo_summary(ledger)
+
+@fragment(FRAGMENT_INPUT)
+def input_form(ledger):
     with st.container():
         st.subheader("Input Transaksi")
+        show_flash("pesan_input")
 
         col1, col2, col3, col4, col5, col6 = st.columns(6)
 
-        akun_list = st.session_state.akun_list
-        kategori_map = st.session_state.kategori_map
-        kategori_list = st.session_state.kategori_list
+        chart = ledger.chart
+
+        if st.session_state.edit_index is not None and st.session_state.edit_index not in ledger:
+            st.warning("Transaksi yang sedang diedit sudah dihapus oleh user lain.")
+            st.session_state.edit_index = None
 
+        # Nilai widget dibaca callback dari session_state, jadi setiap widget diberi key.
+        # Key form edit memuat id dan versi baris agar nilainya tidak terbawa ke edit berikutnya.
         if st.session_state.edit_index is None:
             # Mode input baru
-            tanggal = col1.date_input("Tanggal")
-            deskripsi = col2.text_input("Deskripsi")
-            akun = col3.selectbox("Akun", akun_list)
-            # kategorinya otomatis dari kategori_map; fallback ke 'Lainnya' jika tidak ada
-            kategori = kategori_map.get(akun, "Lainnya")
+            suffix = "baru"
+            col1.date_input("Tanggal", key=f"form_tanggal_{suffix}")
+            col2.text_input("Deskripsi", key=f"form_deskripsi_{suffix}")
+            akun = col3.selectbox("Akun", chart.names(), key=f"form_akun_{suffix}")
+            # kategorinya otomatis dari chart of accounts; fallback ke 'Lainnya' jika tidak ada
+            kategori = chart.kategori(akun)
             col4.write(f"Kategori: **{kategori}**")
-            debit = col5.number_input("Debit", min_value=0, value=0)
-            kredit = col6.number_input("Kredit", min_value=0, value=0)
+            col5.number_input("Debit", min_value=0, value=0, key=f"form_debit_{suffix}")
+            col6.number_input("Kredit", min_value=0, value=0, key=f"form_kredit_{suffix}")
 
-            if st.button("Tambah Transaksi"):
-                add_transaction(tanggal, deskripsi, akun, kategori, debit, kredit)
-                st.success("Transaksi berhasil ditambahkan!")
+            st.button("Tambah Transaksi", on_click=_on_tambah, args=(suffix,))
 
         else:
             # Mode edit data
-            row = st.session_state.data.loc[st.session_state.edit_index]
+            row = ledger.row(st.session_state.edit_index)
+            suffix = f"{st.session_state.edit_index}_{st.session_state.edit_version}"
 
-            tanggal = col1.date_input("Tanggal", value=pd.to_datetime(row["Tanggal"]))
-            deskripsi = col2.text_input("Deskripsi", value=row["Deskripsi"])
-            akun = col3.selectbox("Akun", akun_list, index=akun_list.index(row["Akun"]))
-            kategori = kategori_map.get(akun, "Lainnya")
+            col1.date_input(
+                "Tanggal", value=pd.to_datetime(row["Tanggal"]), key=f"form_tanggal_{suffix}"
+            )
+            col2.text_input("Deskripsi", value=row["Deskripsi"], key=f"form_deskripsi_{suffix}")
+            akun = col3.selectbox(
+                "Akun", chart.names(), index=chart.position(row["Akun"]), key=f"form_akun_{suffix}"
+            )
+            kategori = chart.kategori(akun)
             col4.write(f"Kategori: **{kategori}**")
-            debit = col5.number_input("Debit", min_value=0, value=int(row["Debit"]))
-            kredit = col6.number_input("Kredit", min_value=0, value=int(row["Kredit"]))
+            col5.number_input(
+                "Debit", min_value=0, value=int(row["Debit"]), key=f"form_debit_{suffix}"
+            )
+            col6.number_input(
+                "Kredit", min_value=0, value=int(row["Kredit"]), key=f"form_kredit_{suffix}"
+            )
 
-            if st.button("Simpan Perubahan"):
-                update_transaction(st.session_state.edit_index, tanggal, deskripsi, akun, kategori, debit, kredit)
-                st.session_state.edit_index = None
-                st.success("Data berhasil diperbarui!")
+            st.button("Simpan Perubahan", on_click=_on_simpan_edit, args=(suffix,))
+            st.button("Batal/Selesai Edit", on_click=_selesai_edit)
+
+def _form_row(suffix):
+    """Isi form (tanggal, deskripsi, akun, kategori, debit, kredit) dari session_state."""
+    state = st.session_state
+    akun = state[f"form_akun_{suffix}"]
+    return (
+        state[f"form_tanggal_{suffix}"], state[f"form_deskripsi_{suffix}"], akun,
+        get_ledger().chart.kategori(akun),
+        state[f"form_debit_{suffix}"], state[f"form_kredit_{suffix}"],
+    )
 
-            if st.button("Batal/Selesai Edit"):
-                st.session_state.edit_index = None
+def _on_tambah(suffix):
+    try:
+        add_transaction(*_form_row(suffix))
+    except PeriodClosed as e:
+        flash("pesan_input", "error", str(e))
+    else:
+        flash("pesan_input", "success", "Transaksi berhasil ditambahkan!")
+        invalidate(FRAGMENT_INPUT, *DATA_FRAGMENTS)
 
-    # ===============================
-    # Tabel Data
-    # ===============================
-    st.subheader("📄 Daftar Transaksi")
+def _on_simpan_edit(suffix):
+    index = st.session_state.edit_index
+    st.session_state.edit_index = None
+    try:
+        update_transaction(index, *_form_row(suffix), expected_version=st.session_state.edit_version)
+    except LedgerConflict:
+        flash("pesan_input", "error",
+              "Transaksi ini sudah diubah atau dihapus user lain. Buka ulang untuk mengedit.")
+    except PeriodClosed as e:
+        flash("pesan_input", "error", str(e))
+    else:
+        flash("pesan_input", "success", "Data berhasil diperbarui!")
+        invalidate(FRAGMENT_INPUT, *DATA_FRAGMENTS)
 
-    if not st.session_state.data.empty:
-        for idx, row in st.session_state.data.iterrows():
-            cols = st.columns([2, 3, 2, 2, 2, 2, 2, 2])
+def _selesai_edit():
+    st.session_state.edit_index = None
 
-            cols[0].write(row["Tanggal"])
-            cols[1].write(row["Deskripsi"])
-            cols[2].write(row["Akun"])
-            cols[3].write(row["Kategori"])
-            cols[4].write(row["Debit"])
-            cols[5].write(row["Kredit"])
+@fragment(FRAGMENT_TABEL)
+def transaction_table(ledger):
+    undo_controls()
 
-            if cols[6].button("Edit", key=f"edit_{idx}"):
-                st.session_state.edit_index = idx
+    if ledger.empty:
+        st.info("Belum ada transaksi. Tambahkan transaksi di atas.")
+        return
 
-            if cols[7].button("Hapus", key=f"delete_{idx}"):
-                delete_transaction(idx)
-                st.rerun()
+    chart = ledger.chart
+
+    # Filter, urutan dan paginasi dihitung di server; browser hanya menerima satu halaman
+    col_f1, col_f2, col_f3, col_f4, col_f5 = st.columns([3, 3, 2, 2, 2])
+    filter_akun = col_f1.multiselect("Filter Akun", chart.names())
+    filter_kategori = col_f2.multiselect("Filter Kategori", chart.categories)
+    sort_by = col_f3.selectbox("Urutkan", ["Tanggal", "Akun", "Kategori", "Debit", "Kredit"])
+    urutan = col_f4.selectbox("Arah", ["Naik", "Turun"])
+    page_size = col_f5.selectbox("Baris per halaman", PAGE_SIZES, index=1)
+
+    col_p1, col_p2, col_p3, col_p4, col_p5 = st.columns([2, 3, 3, 2, 2])
+    awal, akhir = date_range_filter("transaksi", col_p1, col_p2)
+    cari = col_p3.text_input("🔎 Cari deskripsi", key="cari_transaksi")
+    nominal_min = col_p4.number_input("Nominal min", min_value=0, value=None, step=1000)
+    nominal_max = col_p5.number_input("Nominal maks", min_value=0, value=None, step=1000)
+
+    # Pencarian lewat index kata dan rentang tanggal lewat index tanggal (bisect), jadi
+    # hanya baris yang relevan yang diambil sebelum filter lain diterapkan
+    if cari.strip():
+        base = ledger.search(cari, awal, akhir)
+    else:
+        base = ledger.frame_between(awal, akhir)
+    filtered = filter_transactions(
+        base, filter_akun, filter_kategori, nominal_min, nominal_max
+    )
+    total_rows = len(filtered)
 
-        # ===============================
-        # Export Buttons
-        # ===============================
-        st.subheader("📦 Export Data")
+    # Nomor halaman dibatasi sebelum widget dibuat (jumlah halaman bisa berkurang)
+    n_pages = max(1, -(-total_rows // page_size))
+    if st.session_state.get("halaman_transaksi", 1) > n_pages:
+        st.session_state.halaman_transaksi = n_pages
 
-        col_e1, col_e2 = st.columns(2)
+    page = st.number_input(
+        f"Halaman (dari {n_pages}, total {total_rows} transaksi)",
+        min_value=1, max_value=n_pages, step=1, key="halaman_transaksi"
+    )
 
-        with col_e1:
-            st.download_button(
-                label="⬇️ Export ke Excel",
-                data=export_excel(),
-                file_name="laporan_keuangan.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+    page_df = page_slice(
+        filtered, sort_by=sort_by, ascending=(urutan == "Naik"),
+        page=page, page_size=page_size
+    )
 
-        with col_e2:
-            st.download_button(
-                label="⬇️ Export ke CSV",
-                data=export_csv(),
-                file_name="laporan_keuangan.csv",
-                mime="text/csv"
-            )
+    if st.toggle(
+        "✏️ Mode edit massal", key="mode_edit_massal",
+        help="Ubah, tambah dan hapus banyak baris langsung di tabel, lalu simpan sekaligus."
+    ):
+        batch_editor(ledger, page_df, chart)
     else:
-        st.info("Belum ada transaksi. Tambahkan transaksi di atas.")
+        selection = st.dataframe(
+            page_df,
+            on_select="rerun",
+            selection_mode="single-row",
+            key="tabel_transaksi",
+            column_config=TANGGAL_COLUMN,
+        )
 
-    # ===============================
-    # Ringkasan Saldo
-    # ===============================
-    st.subheader("📊 Ringkasan Saldo")
+        # Aksi Edit/Hapus berlaku untuk baris yang dipilih di tabel
+        # (pilihan lama bisa menunjuk ke luar halaman setelah ada baris yang dihapus)
+        selected_rows = [i for i in selection.selection.rows if i < len(page_df)]
+        if selected_rows:
+            selected_id = page_df.index[selected_rows[0]]
+            closed = ledger.closed_until
+            locked = closed is not None and page_df.at[selected_id, "Tanggal"] <= closed
+            if locked:
+                st.caption(f"Transaksi terpilih: ID {selected_id} (periode tertutup, tidak bisa diubah)")
+            else:
+                st.caption(f"Transaksi terpilih: ID {selected_id}")
+            col_a1, col_a2, _ = st.columns([1, 1, 6])
+
+            col_a1.button("Edit", disabled=locked, on_click=_on_edit, args=(selected_id,))
+            col_a2.button("Hapus", disabled=locked, on_click=_on_hapus, args=(selected_id,))
+        else:
+            st.caption("Pilih satu baris di tabel untuk Edit atau Hapus.")
+
+def _on_edit(row_id):
+    st.session_state.edit_index = row_id
+    st.session_state.edit_version = get_ledger().row_version(row_id)
+    invalidate(FRAGMENT_INPUT)
+
+def _on_hapus(row_id):
+    try:
+        delete_transaction(row_id)
+    except (LedgerConflict, PeriodClosed):
+        pass  # sudah dihapus user lain, atau periodenya baru saja ditutup
+    fragments = DATA_FRAGMENTS
+    if st.session_state.edit_index == row_id:
+        st.session_state.edit_index = None
+        fragments = [FRAGMENT_INPUT, *DATA_FRAGMENTS]
+    invalidate(*fragments)
+
+@fragment(FRAGMENT_EXPORT)
+def export_panel(ledger):
+    if ledger.empty:
+        return
+
+    st.subheader("📦 Export Data")
+
+    # File dibangun di thread latar belakang (lihat keuangan_jobs), jadi halaman tetap bisa
+    # dipakai selama export besar berjalan. Hasilnya di-cache per versi ledger.
+    # Parquet/Arrow menyimpan tipe kolom, cocok untuk dibuka di notebook analitik.
+    columns = st.columns(len(EXPORT_JOBS))
+    for col, (label, (_, _, _, help_text)) in zip(columns, EXPORT_JOBS.items()):
+        col.button(f"⬇️ {label}", help=help_text, on_click=_on_export, args=(ledger, label))
+    job_list()
 
-    total_debit = st.session_state.data["Debit"].sum()
-    total_kredit = st.session_state.data["Kredit"].sum()
+def job_list():
+    # Progress hanya di-poll selama ada job yang masih berjalan
+    if any(job.active for job in _session_jobs()):
+        export_jobs_live(live=True)
+    else:
+        export_jobs()
+
+def export_jobs(live=False):
+    """Job export sesi ini: progress dan tombol Batal, lalu link download setelah selesai."""
+    jobs = _session_jobs()
+    for job in jobs:
+        col1, col2, col3 = st.columns([5, 2, 1])
+        if job.active:
+            col1.progress(job.progress, text=f"{job.label}: {job.status.lower()} ({job.progress:.0%})")
+            col3.button("Batal", key=f"batal_job_{job.id}", on_click=job.cancel)
+            continue
+
+        if job.status == SELESAI:
+            col1.write(f"✅ {job.label} siap")
+            col2.download_button(
+                "⬇️ Download", data=job.data, file_name=job.file_name, mime=job.mime,
+                key=f"download_job_{job.id}", on_click="ignore"
+            )
+        elif job.status == GAGAL:
+            col1.error(f"{job.label} gagal: {job.error}")
+        else:
+            col1.write(f"✖️ {job.label} {job.status.lower()}")
+        col3.button("Tutup", key=f"tutup_job_{job.id}", on_click=_dismiss_job, args=(job.id,))
+
+    # Semua job sudah selesai: rerun penuh sekali agar panel kembali ke versi tanpa polling
+    if live and not any(job.active for job in jobs):
+        st.rerun()
+
+export_jobs_live = st.fragment(run_every=JOB_POLL_SECONDS)(export_jobs)
+
+def _session_jobs():
+    # Job yang sudah dibuang pool (kedaluwarsa) ikut dihapus dari daftar sesi
+    jobs = [get_jobs().get(job_id) for job_id in st.session_state.export_jobs]
+    jobs = [job for job in jobs if job is not None]
+    st.session_state.export_jobs = [job.id for job in jobs]
+    return jobs
+
+def _on_export(ledger, label):
+    export, file_name, mime, _ = EXPORT_JOBS[label]
+    job = get_jobs().submit(lambda report: export(ledger, progress=report), label, file_name, mime)
+    st.session_state.export_jobs.append(job.id)
+
+def _dismiss_job(job_id):
+    get_jobs().dismiss(job_id)
+    st.session_state.export_jobs.remove(job_id)
+
+@fragment(FRAGMENT_RINGKASAN)
+def saldo_summary(ledger):
+    total_debit, total_kredit = ledger.totals()
     saldo = total_debit - total_kredit
 
     colA, colB, colC = st.columns(3)
@@ -353,6 +773,7 @@ def transaksi_page():
 # =======================================================================================
 # HALAMAN BUKU BESAR
 # =======================================================================================
+@profiled()
 def buku_besar_page():
     st.title("📗 Buku Besar")
     
@@ -362,24 +783,114 @@ def buku_besar_page():
     setiap akun yang menjadi dasar penyusunan laporan keuangan.**
     """)
 
-    if st.session_state.data.empty:
+    ledger = get_ledger()
+    akun_list = ledger.account_names()
+    if not akun_list:
         st.info("Belum ada data transaksi.")
         return
 
-    akun_list = st.session_state.data["Akun"].unique()
-    akun_pilihan = st.selectbox("Pilih Akun", akun_list)
+    # Akun diurutkan menurut pohon chart of accounts; akun induk ikut muncul jika salah satu
+    # sub-akunnya punya transaksi
+    chart = ledger.chart
+    depths = {akun: tingkat for akun, tingkat in chart.tree() if akun in chart.subtotals}
+    akun_list = list(depths) + [akun for akun in akun_list if akun not in chart]
+
+    semua_akun = st.toggle("Semua akun", key="buku_besar_semua_akun")
+    col1, col2, col3 = st.columns([3, 2, 3])
+    if not semua_akun:
+        akun_pilihan = col1.selectbox(
+            "Pilih Akun", akun_list, key="buku_besar_akun",
+            format_func=lambda akun: indent_akun(akun, depths.get(akun, 0))
+        )
+    awal, akhir = date_range_filter("buku_besar", col2, col3)
+
+    closed = ledger.closed_until
+    semua_periode = closed is not None and st.checkbox("Tampilkan juga periode yang sudah ditutup")
+    open_period = not semua_periode
+
+    if semua_akun:
+        all_accounts_ledger(ledger, awal, akhir, open_period)
+        return
 
-    df = st.session_state.data[st.session_state.data["Akun"] == akun_pilihan].copy()
-    df = df.sort_values("Tanggal")
+    sub_akun = akun_pilihan in chart.children and st.checkbox(
+        "Sertakan sub-akun", value=True, key="buku_besar_sub_akun"
+    )
 
-    df["Saldo"] = (df["Debit"] - df["Kredit"]).cumsum()
+    # Urutan tanggal dan saldo berjalan sudah dipelihara oleh index per akun; rentang
+    # tanggal (dan periode berjalan setelah penutupan) dipotong dengan bisect
+    df = ledger.account_ledger(
+        akun_pilihan, awal, akhir, open_period=open_period, sub_akun=sub_akun
+    )
 
     st.write(f"### Buku Besar: {akun_pilihan}")
-    st.dataframe(df)
+    account_drill(chart, akun_pilihan)
+    if awal is not None or (closed is not None and open_period):
+        saldo_awal = ledger.opening_balance(
+            akun_pilihan, awal, open_period=open_period, sub_akun=sub_akun
+        )
+        st.caption(f"Saldo awal: Rp {saldo_awal:,.0f}")
+    st.dataframe(df, column_config=TANGGAL_COLUMN)
+
+def account_drill(chart, akun):
+    """Navigasi naik ke akun induk atau turun ke sub-akun, dengan subtotal masing-masing."""
+    induk = chart.parents.get(akun)
+    children = [child for child in chart.children.get(akun, []) if child in chart.subtotals]
+    if induk is None and not children:
+        return
+
+    if induk is not None:
+        st.button(f"⬆️ {induk}", key="drill_induk", on_click=_drill_to, args=(induk,))
+    if children:
+        # Subtotal per sub-akun (termasuk sub-akunnya sendiri) dibaca dari chart of accounts
+        debit, kredit = chart.subtotal(akun)
+        st.caption(f"Saldo {akun} termasuk sub-akun: Rp {debit - kredit:,.0f}")
+        for col, child in zip(st.columns(len(children)), children):
+            debit, kredit = chart.subtotal(child)
+            col.button(
+                f"⬇️ {child}", key=f"drill_{child}", on_click=_drill_to, args=(child,),
+                help=f"Saldo: Rp {debit - kredit:,.0f}"
+            )
+
+def _drill_to(akun):
+    st.session_state.buku_besar_akun = akun
+
+def all_accounts_ledger(ledger, awal, akhir, open_period):
+    """Buku besar semua akun: ringkasan saldo per akun, rincian, dan export ZIP per akun."""
+    # Baris sudah terpisah dan terurut per akun dari index, jadi ringkasan cukup satu groupby
+    df = ledger.all_account_ledgers(awal, akhir, open_period=open_period)
+    ringkasan = df.groupby("Akun", observed=True, sort=False).agg(
+        Debit=("Debit", "sum"), Kredit=("Kredit", "sum"), Saldo_akhir=("Saldo", "last")
+    )
+    ringkasan.insert(0, "Saldo_awal", ringkasan["Saldo_akhir"] - ringkasan["Debit"] + ringkasan["Kredit"])
+    ringkasan.columns = ["Saldo Awal", "Debit", "Kredit", "Saldo Akhir"]
+
+    st.write(f"### Buku Besar: {len(ringkasan)} akun")
+    st.dataframe(ringkasan)
+    # Isi expander tetap dikirim saat tertutup: tampilkan per halaman seperti tabel transaksi
+    with st.expander(f"Rincian ({len(df)} transaksi)"):
+        n_pages = max(1, -(-len(df) // RINCIAN_PAGE_SIZE))
+        if st.session_state.get("halaman_rincian", 1) > n_pages:
+            st.session_state.halaman_rincian = n_pages
+        page = st.number_input(
+            f"Halaman (dari {n_pages})", min_value=1, max_value=n_pages, step=1,
+            key="halaman_rincian"
+        )
+        # Sudah urut per akun lalu tanggal: tanpa sort ulang
+        st.dataframe(
+            page_slice(df, sort_by=None, page=page, page_size=RINCIAN_PAGE_SIZE),
+            column_config=TANGGAL_COLUMN
+        )
+
+    # Workbook per akun ditulis paralel di process pool (lihat keuangan_export)
+    label = "Buku Besar Semua Akun (ZIP)"
+    st.button(f"⬇️ {label}", help=EXPORT_JOBS[label][3], on_click=_on_export, args=(ledger, label),
+              key="export_buku_besar")
+    job_list()
 
 # =======================================================================================
 # HALAMAN NERACA
 # =======================================================================================
+@profiled()
 def neraca_page():
     st.title("📘 Neraca")
     
@@ -389,30 +900,206 @@ def neraca_page():
     apa yang dimiliki dan apa yang menjadi sumber pendanaannya.**
     """)
 
-    if st.session_state.data.empty:
+    ledger = get_ledger()
+    if ledger.empty:
         st.info("Belum ada data transaksi.")
         return
 
-    df = st.session_state.data.copy()
-    df["Saldo"] = df["Debit"] - df["Kredit"]
+    as_of = None
+    if st.checkbox("Neraca per tanggal tertentu"):
+        as_of = st.date_input("Per tanggal")
 
-    aset = df[df["Kategori"] == "Aset"]["Saldo"].sum()
-    kewajiban = df[df["Kategori"] == "Kewajiban"]["Saldo"].sum()
-    ekuitas = df[df["Kategori"] == "Ekuitas"]["Saldo"].sum()
+    # Saldo per akun dari mesin agregasi (tanpa memindai seluruh transaksi); laba berjalan
+    # dihitung dari tabel yang sama seperti di halaman Laba Rugi
+    table = ledger.balance_table(as_of)
+    totals = neraca_totals(table)
 
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Total Aset", f"Rp {aset:,.0f}")
-    col2.metric("Total Kewajiban", f"Rp {kewajiban:,.0f}")
-    col3.metric("Total Ekuitas", f"Rp {ekuitas:,.0f}")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Aset", f"Rp {totals['Aset']:,.0f}")
+    col2.metric("Total Kewajiban", f"Rp {totals['Kewajiban']:,.0f}")
+    col3.metric("Total Ekuitas", f"Rp {totals['Ekuitas']:,.0f}")
+    col4.metric("Laba (Rugi) Berjalan", f"Rp {totals['Laba']:,.0f}")
 
     st.write("### Neraca Detail")
-    st.dataframe(df[["Akun", "Kategori", "Saldo"]])
+    if ledger.chart.nested:
+        neraca_tree(ledger, as_of)
+    else:
+        st.dataframe(table, hide_index=True)
+
+def neraca_tree(ledger, as_of):
+    """Neraca per pohon akun: buka akun induk dan atur kedalaman sub-akun yang ditampilkan."""
+    chart = ledger.chart
+    # Subtotal setiap induk sudah dipelihara ledger (atau dijumlah dari saldo per akun untuk
+    # `as_of`), jadi turun atau naik tingkat hanya menyaring baris, tanpa agregasi ulang
+    rollup = ledger.rollup_table(as_of)
+
+    col1, col2 = st.columns(2)
+    fokus = col1.selectbox(
+        "Buka akun", [""] + list(chart.children), key="neraca_fokus",
+        format_func=lambda akun: akun or "(Semua akun)"
+    )
+    if fokus:
+        rollup = rollup[rollup["Akun"].isin(chart.subtree(fokus))]
+    top = chart.depth(fokus) if fokus else 0
+    levels = int(rollup["Tingkat"].max()) - top + 1 if not rollup.empty else 1
+    kedalaman = levels
+    if levels > 1:
+        # Key ikut akun yang dibuka: setiap akun mulai dari tampilan penuh
+        kedalaman = col2.slider(
+            "Kedalaman", 1, levels, levels, key=f"neraca_kedalaman_{fokus}_{levels}"
+        )
+
+    rollup = rollup[rollup["Tingkat"] < top + kedalaman]
+    akun = [indent_akun(a, t - top) for a, t in zip(rollup["Akun"], rollup["Tingkat"])]
+    st.dataframe(
+        rollup.assign(Akun=akun)[["Kategori", "Akun", "Debit", "Kredit", "Saldo"]],
+        hide_index=True,
+    )
+
+# =======================================================================================
+# HALAMAN NERACA SALDO
+# =======================================================================================
+def _format_bulan(bulan):
+    return f"{NAMA_BULAN[bulan.month - 1]} {bulan.year}"
+
+@profiled()
+def neraca_saldo_page():
+    st.title("📙 Neraca Saldo")
+
+    st.markdown("""
+    **Neraca saldo adalah daftar seluruh akun beserta saldo akhirnya di sisi debit atau kredit pada akhir suatu periode,
+    dipakai untuk memastikan total debit sama dengan total kredit sebelum laporan keuangan disusun.**
+    """)
+
+    ledger = get_ledger()
+    months = ledger.months()
+    if not months:
+        st.info("Belum ada data transaksi.")
+        return
+
+    bulan = st.selectbox(
+        "Per akhir bulan", months[::-1], format_func=_format_bulan, key="neraca_saldo_bulan"
+    )
+
+    # Dari index saldo per bulan yang sama dengan Neraca dan Laba Rugi
+    table = trial_balance(ledger.period_balance_table(None, bulan))
+    total_debit = int(table["Saldo Debit"].sum())
+    total_kredit = int(table["Saldo Kredit"].sum())
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total Saldo Debit", f"Rp {total_debit:,.0f}")
+    col2.metric("Total Saldo Kredit", f"Rp {total_kredit:,.0f}")
+    col3.metric("Selisih", f"Rp {total_debit - total_kredit:,.0f}")
+
+    st.dataframe(table, hide_index=True)
+
+# =======================================================================================
+# HALAMAN LABA RUGI
+# =======================================================================================
+@profiled()
+def laba_rugi_page():
+    st.title("📒 Laba Rugi")
+
+    st.markdown("""
+    **Laporan laba rugi menunjukkan pendapatan dan beban selama suatu periode, sehingga terlihat apakah usaha
+    memperoleh laba atau menderita rugi pada periode tersebut.**
+    """)
+
+    ledger = get_ledger()
+    months = ledger.months()
+    if not months:
+        st.info("Belum ada data transaksi.")
+        return
+
+    col1, col2 = st.columns(2)
+    awal = col1.selectbox("Dari bulan", months, format_func=_format_bulan, key="laba_rugi_awal")
+    akhir = col2.selectbox(
+        "Sampai bulan", months, index=len(months) - 1, format_func=_format_bulan, key="laba_rugi_akhir"
+    )
+    if awal > akhir:
+        st.warning("Bulan awal harus sebelum atau sama dengan bulan akhir.")
+        return
+
+    table = ledger.period_balance_table(awal, akhir)
+    rows = income_statement(table)
+    pendapatan = rows[rows["Kategori"] == PENDAPATAN]
+    beban = rows[rows["Kategori"] == BEBAN]
+
+    colA, colB, colC = st.columns(3)
+    colA.metric("Total Pendapatan", f"Rp {pendapatan['Jumlah'].sum():,.0f}")
+    colB.metric("Total Beban", f"Rp {beban['Jumlah'].sum():,.0f}")
+    colC.metric("Laba (Rugi) Bersih", f"Rp {net_income(table):,.0f}")
+
+    st.write("### Pendapatan")
+    st.dataframe(pendapatan[["Akun", "Jumlah"]], hide_index=True)
+    st.write("### Beban")
+    st.dataframe(beban[["Akun", "Jumlah"]], hide_index=True)
+
+# =======================================================================================
+# HALAMAN TUTUP PERIODE
+# =======================================================================================
+@profiled()
+def tutup_periode_page():
+    st.title("🔒 Tutup Periode")
+
+    st.markdown("""
+    **Penutupan periode membekukan semua transaksi sampai akhir bulan atau tahun yang dipilih. Saldo setiap akun
+    pada tanggal itu disimpan, transaksi di periode tersebut tidak bisa lagi ditambah, diubah atau dihapus,
+    dan laporan dihitung mulai dari saldo penutupan terakhir.**
+    """)
+
+    ledger = get_ledger()
+    closed = ledger.closed_until
+    if closed is None:
+        st.info("Belum ada periode yang ditutup.")
+    else:
+        st.write(f"Periode tertutup sampai dengan **{closed:%Y-%m-%d}**.")
+
+    jenis = st.radio("Jenis periode", ["Bulan", "Tahun"], horizontal=True)
+    today = date.today()
+    col1, col2 = st.columns(2)
+    tahun = col1.number_input("Tahun", min_value=1900, max_value=today.year, value=today.year, step=1)
+    if jenis == "Bulan":
+        bulan = col2.selectbox(
+            "Bulan", range(1, 13), index=today.month - 1, format_func=lambda m: NAMA_BULAN[m - 1]
+        )
+        akhir = pd.Timestamp(int(tahun), bulan, 1) + pd.offsets.MonthEnd(0)
+    else:
+        akhir = pd.Timestamp(int(tahun), 12, 31)
+
+    st.write(f"Transaksi sampai dengan **{akhir:%Y-%m-%d}** akan dibekukan.")
+    if st.button("Tutup Periode"):
+        if akhir.date() >= today:
+            st.error("Periode ini belum berakhir.")
+        else:
+            try:
+                ledger.close_period(akhir)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                st.success(f"Periode s.d. {akhir:%Y-%m-%d} berhasil ditutup.")
+
+    closings = ledger.closings()
+    if closings:
+        st.write("### Riwayat Penutupan")
+        riwayat = pd.DataFrame([
+            {"Tanggal": tanggal, **category_totals(table)} for tanggal, table in reversed(closings)
+        ]).fillna(0)
+        st.dataframe(riwayat, hide_index=True, column_config=TANGGAL_COLUMN)
+
+        tanggal_pilihan = st.selectbox(
+            "Saldo per akun pada penutupan", [t for t, _ in reversed(closings)],
+            format_func=lambda t: f"{t:%Y-%m-%d}"
+        )
+        st.dataframe(dict(closings)[tanggal_pilihan], hide_index=True)
 
 # =======================================================================================
 # HALAMAN CHART OF ACCOUNTS (MANAGE AKUN & KATEGORI)
 # =======================================================================================
+@profiled()
 def chart_akun_page():
-    
+    chart = get_ledger().chart
+
     # --- RESET INPUT (HARUS SEBELUM WIDGET DITAMPILKAN) ---
     if "reset_input_akun" in st.session_state and st.session_state.reset_input_akun:
         st.session_state["akun_input_widget"] = ""
@@ -441,14 +1128,25 @@ def chart_akun_page():
 
         akun_baru = st.text_input("Nama Akun", key="akun_input_widget")
 
-        kategori_pilihan = st.selectbox(
-            "Pilih Kategori",
-            st.session_state.kategori_list,
-            key="select_kategori_widget"
+        induk = st.selectbox(
+            "Akun Induk (opsional)",
+            [""] + chart.names(),
+            key="induk_akun_widget"
         )
 
+        if induk:
+            # Sub-akun selalu satu kategori dengan induknya
+            kategori_pilihan = chart.kategori(induk)
+            st.caption(f"Kategori mengikuti akun induk: **{kategori_pilihan}**")
+        else:
+            kategori_pilihan = st.selectbox(
+                "Pilih Kategori",
+                chart.categories,
+                key="select_kategori_widget"
+            )
+
         if st.button("Tambah Akun"):
-            if add_account(akun_baru, kategori_pilihan):
+            if add_account(akun_baru, kategori_pilihan, induk or None):
                 st.session_state.reset_input_akun = True
                 st.rerun()
 
@@ -468,20 +1166,36 @@ def chart_akun_page():
     with col_view:
         st.subheader("Daftar Akun")
 
+        # Urut pohon: setiap induk diikuti sub-akunnya. Saldo dibaca dari subtotal yang
+        # dipelihara ledger (sudah termasuk semua sub-akun), bukan dijumlah ulang di sini.
+        tree = chart.tree()
         df_coa = pd.DataFrame({
-            "Akun": st.session_state.akun_list,
-            "Kategori": [
-                st.session_state.kategori_map.get(a, "Lainnya")
-                for a in st.session_state.akun_list
-            ]
+            "Akun": [indent_akun(a, tingkat) for a, tingkat in tree],
+            "Kategori": [chart.kategori(a) for a, _ in tree],
+            "Transaksi": [chart.usage.get(a, 0) for a, _ in tree],
+            "Saldo": [debit - kredit for debit, kredit in (chart.subtotal(a) for a, _ in tree)],
         })
 
-        st.dataframe(df_coa, use_container_width=True)
+        st.dataframe(df_coa, use_container_width=True, hide_index=True)
+
+        st.markdown("### Ubah Induk Akun")
+        col_sub, col_induk = st.columns(2)
+        akun_pindah = col_sub.selectbox("Akun", [""] + chart.names(), key="pindah_akun_select")
+        induk_baru = col_induk.selectbox(
+            "Induk baru (kosong = tingkat teratas)", [""] + chart.names(), key="pindah_induk_select"
+        )
+
+        if st.button("Simpan Induk"):
+            if akun_pindah:
+                if set_parent(akun_pindah, induk_baru or None):
+                    st.rerun()
+            else:
+                st.warning("Pilih akun terlebih dahulu!")
 
         st.markdown("### Hapus Akun")
         akun_to_delete = st.selectbox(
             "Pilih akun yang ingin dihapus:",
-            [""] + st.session_state.akun_list,
+            [""] + chart.names(),
             key="del_acc_select"
         )
 
@@ -494,25 +1208,68 @@ def chart_akun_page():
 
         st.markdown("---")
         st.subheader("Daftar Kategori")
-        st.write(st.session_state.kategori_list)
+        st.write(chart.categories)
 
 # =======================================================================================
 # NAVIGASI MENU
 # =======================================================================================
-menu = st.sidebar.selectbox("Menu", ["Transaksi", "Buku Besar", "Neraca", "Chart Akun"])
+menu = st.sidebar.selectbox("Menu", [
+    "Transaksi", "Buku Besar", "Neraca", "Neraca Saldo", "Laba Rugi", "Tutup Periode", "Chart Akun"
+])
 
 # =======================================================================================
-# EKSEKUSI UTAMA
+# PANEL PROFILING (KHUSUS ADMIN)
 # =======================================================================================
-if not st.session_state.get("logged_in", False):
-    login_page()
-else:
-    if menu == "Transaksi":
-        transaksi_page()
-    elif menu == "Buku Besar":
-        buku_besar_page()
-    elif menu == "Neraca":
-        neraca_page()
-    elif menu == "Chart Akun":
-        chart_akun_page()
+profiling_panel = None
+if st.session_state.get("logged_in", False) and st.session_state.get("current_user") in PROFILING_USERS:
+    profiling_panel = st.sidebar.expander("⏱️ Profiling")
+    with profiling_panel:
+        st.toggle("Aktifkan profiling", key="profiling_aktif")
+        st.checkbox(
+            "Ukur memori (tracemalloc, lebih lambat)", key="profiling_memori",
+            help="Memori diukur untuk seluruh proses: termasuk sesi lain yang berjalan bersamaan."
+        )
+        st.checkbox("Simpan ke log lokal", key="profiling_log")
+
+def show_profile(profile):
+    """Rincian waktu per bagian rerun ini di panel sidebar (dan log lokal bila dipilih)."""
+    with profiling_panel:
+        caption = f"Rerun ini: {profile.total_ms:,.1f} ms"
+        if profile.peak_kb is not None:
+            caption += f" · puncak memori proses {profile.peak_kb / 1024:,.1f} MB"
+        st.caption(caption)
+        st.dataframe(pd.DataFrame(profile.as_rows()), hide_index=True)
+        # Rerun fragment sejak rerun penuh sebelumnya (tidak bisa menulis ke sidebar sendiri)
+        for key, fragment_profile in st.session_state.pop("profil_fragment", []):
+            st.caption(f"Rerun fragment {key}: {fragment_profile.total_ms:,.1f} ms")
+            st.dataframe(pd.DataFrame(fragment_profile.as_rows()), hide_index=True)
+    if st.session_state.get("profiling_log"):
+        append_log(profile, halaman=menu, user=st.session_state.get("current_user"))
 
+# =======================================================================================
+# EKSEKUSI UTAMA
+# =======================================================================================
+try:
+    if not st.session_state.get("logged_in", False):
+        login_page()
+    else:
+        if menu == "Transaksi":
+            transaksi_page()
+        elif menu == "Buku Besar":
+            buku_besar_page()
+        elif menu == "Neraca":
+            neraca_page()
+        elif menu == "Neraca Saldo":
+            neraca_saldo_page()
+        elif menu == "Laba Rugi":
+            laba_rugi_page()
+        elif menu == "Tutup Periode":
+            tutup_periode_page()
+        elif menu == "Chart Akun":
+            chart_akun_page()
+finally:
+    # Juga menutup profil saat rerun dihentikan lebih awal (st.rerun / st.stop)
+    profile = finish_rerun()
+
+if profile is not None and profiling_panel is not None:
+    show_profile(profile)
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keuangan_ledger import Ledger  # noqa: E402
+from keuangan_store import DEFAULT_KATEGORI_LIST, DEFAULT_KATEGORI_MAP, LedgerStore  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "keuangan.db")
+    store = LedgerStore(path)
+    store.init_chart(DEFAULT_KATEGORI_MAP, DEFAULT_KATEGORI_LIST)
+    store.close()
+    return path
+
+
+def test_delete_parent_with_children_is_rejected(db_path):
+    ledger = Ledger(LedgerStore(db_path))
+    ledger.add_account("Kas Kecil", "Aset", "Kas")
+
+    with pytest.raises(ValueError, match="sub-akun"):
+        ledger.delete_account("Kas")
+
+    # Chart di memori dan database tetap sama, juga setelah restart
+    assert "Kas" in ledger.chart
+    reloaded = Ledger(LedgerStore(db_path))
+    assert "Kas" in reloaded.chart
+    assert reloaded.chart.parents == {"Kas Kecil": "Kas"}
+
+    # Setelah sub-akunnya dihapus, induknya boleh dihapus
+    ledger.delete_account("Kas Kecil")
+    ledger.delete_account("Kas")
+    assert "Kas" not in Ledger(LedgerStore(db_path)).chart
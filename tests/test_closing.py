@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keuangan_index import aggregate_balances  # noqa: E402
+from keuangan_journal import UndoJournal  # noqa: E402
+from keuangan_ledger import Ledger, PeriodClosed  # noqa: E402
+from keuangan_store import DEFAULT_KATEGORI_LIST, DEFAULT_KATEGORI_MAP, LedgerStore  # noqa: E402
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    store = LedgerStore(str(tmp_path / "keuangan.db"))
+    store.init_chart(DEFAULT_KATEGORI_MAP, DEFAULT_KATEGORI_LIST)
+    return Ledger(store)
+
+
+def _row(tanggal, akun="Kas", debit=100, kredit=0):
+    return {"Tanggal": tanggal, "Deskripsi": "x", "Akun": akun,
+            "Kategori": DEFAULT_KATEGORI_MAP[akun], "Debit": debit, "Kredit": kredit}
+
+
+def test_closed_period_rejects_changes(ledger):
+    journal = UndoJournal()
+    closed_id = ledger.add(_row("2024-01-31"), journal=journal)
+    open_id = ledger.add(_row("2024-02-01"))
+    ledger.close_period("2024-01-31")
+
+    with pytest.raises(PeriodClosed):
+        ledger.add(_row("2024-01-31"))
+    with pytest.raises(PeriodClosed):
+        ledger.update(closed_id, _row("2024-01-31", debit=5))
+    with pytest.raises(PeriodClosed):
+        ledger.delete(closed_id)
+    # Memindahkan baris terbuka ke periode tertutup juga ditolak
+    with pytest.raises(PeriodClosed):
+        ledger.update(open_id, _row("2024-01-15"))
+    with pytest.raises(PeriodClosed):
+        journal.undo(ledger)
+    assert journal.can_undo
+    assert ledger.row(closed_id)["Debit"] == 100
+
+    ledger.update(open_id, _row("2024-02-01", debit=7))
+    assert ledger.row(open_id)["Debit"] == 7
+
+
+def test_balance_as_of_after_closing_matches_raw_rows(ledger):
+    random.seed(3)
+    akuns = ["Kas", "Bank", "Modal", "Pendapatan", "Beban"]
+    for _ in range(200):
+        tanggal = pd.Timestamp("2024-01-01") + pd.Timedelta(days=random.randrange(180))
+        ledger.add(_row(tanggal, random.choice(akuns), random.randrange(100), random.randrange(100)))
+    ledger.close_period("2024-03-31")
+    ledger.add(_row("2024-04-02", "Bank", 11, 0))
+
+    frame = ledger.frame
+    for as_of in ["2024-02-15", "2024-03-31", "2024-04-20", "2024-12-31"]:
+        expected = aggregate_balances(frame[frame["Tanggal"] <= as_of])
+        pd.testing.assert_frame_equal(
+            ledger.balance_table(as_of).reset_index(drop=True), expected, check_dtype=False
+        )
+
+
+def test_closing_before_latest_closing_is_rejected(ledger):
+    ledger.add(_row("2024-01-10"))
+    ledger.close_period("2024-02-29")
+    for end in ["2024-02-29", "2024-01-31"]:
+        with pytest.raises(ValueError, match="sudah ditutup"):
+            ledger.close_period(end)
+    assert ledger.closed_until == pd.Timestamp("2024-02-29")
@@ -0,0 +1,74 @@
+import io
+import os
+import sys
+
+import openpyxl
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keuangan_import import import_file  # noqa: E402
+from keuangan_journal import UndoJournal  # noqa: E402
+from keuangan_ledger import Ledger  # noqa: E402
+from keuangan_store import DEFAULT_KATEGORI_LIST, DEFAULT_KATEGORI_MAP, LedgerStore  # noqa: E402
+
+HEADER = ["Tanggal", "Deskripsi", "Akun", "Debit", "Kredit"]
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    store = LedgerStore(str(tmp_path / "keuangan.db"))
+    store.init_chart(DEFAULT_KATEGORI_MAP, DEFAULT_KATEGORI_LIST)
+    return Ledger(store)
+
+
+def _xlsx(rows):
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 100])
+def test_error_rows_match_file_lines_across_blank_lines(ledger, chunk_rows):
+    # Baris 1 header, baris 3 dan 4 kosong, baris 5 tidak valid, baris 7 (setelah kosong) valid
+    csv = (
+        "Tanggal,Deskripsi,Akun,Debit,Kredit\n"
+        "2024-01-02,a,Kas,100,0\n"
+        "\n"
+        ",,,,\n"
+        "bukan tanggal,b,Kas,1,0\n"
+        "\n"
+        "2024-01-03,c,Modal,0,100\n"
+    )
+    added, errors = import_file(
+        ledger, io.BytesIO(csv.encode()), "data.csv", DEFAULT_KATEGORI_MAP, chunk_rows
+    )
+    assert added == 2
+    assert errors["Baris"].tolist() == [5]
+
+    xlsx = _xlsx([
+        HEADER,
+        ["2024-01-02", "a", "Kas", 100, 0],
+        [],
+        ["2024-01-02", "b", "Tidak Ada", 1, 0],
+    ])
+    added, errors = import_file(ledger, xlsx, "data.xlsx", DEFAULT_KATEGORI_MAP, chunk_rows)
+    assert added == 1
+    assert errors["Baris"].tolist() == [4]
+
+
+def test_import_is_one_undo_step(ledger):
+    journal = UndoJournal()
+    csv = "Tanggal,Deskripsi,Akun,Debit,Kredit\n2024-01-02,a,Kas,100,0\n2024-01-03,b,Modal,0,100\n"
+    added, _ = import_file(
+        ledger, io.BytesIO(csv.encode()), "data.csv", DEFAULT_KATEGORI_MAP, journal=journal
+    )
+    assert added == 2 and len(ledger) == 2
+    assert journal.undo_label() == "Tambah 2 baris"
+
+    journal.undo(ledger)
+    assert len(ledger) == 0
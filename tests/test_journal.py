@@ -0,0 +1,72 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keuangan_journal import UndoJournal  # noqa: E402
+from keuangan_ledger import Ledger, LedgerConflict  # noqa: E402
+from keuangan_store import DEFAULT_KATEGORI_LIST, DEFAULT_KATEGORI_MAP, LedgerStore  # noqa: E402
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    store = LedgerStore(str(tmp_path / "keuangan.db"))
+    store.init_chart(DEFAULT_KATEGORI_MAP, DEFAULT_KATEGORI_LIST)
+    return Ledger(store)
+
+
+def _row(debit):
+    return {"Tanggal": "2024-01-02", "Deskripsi": "x", "Akun": "Kas", "Kategori": "Aset",
+            "Debit": debit, "Kredit": 0}
+
+
+def test_undo_redo_across_several_entries_on_one_row(ledger):
+    journal = UndoJournal()
+    row_id = ledger.add(_row(1), journal=journal)
+    ledger.update(row_id, _row(2), journal=journal)
+    ledger.update(row_id, _row(3), journal=journal)
+
+    # Setiap undo/redo memberi baris versi baru; langkah di bawahnya harus ikut menerimanya
+    for action, debit in [("undo", 2), ("undo", 1), ("redo", 2), ("redo", 3),
+                          ("undo", 2), ("undo", 1)]:
+        getattr(journal, action)(ledger)
+        assert ledger.row(row_id)["Debit"] == debit
+
+    journal.undo(ledger)
+    assert row_id not in ledger
+    assert not journal.can_undo
+    journal.redo(ledger)
+    assert ledger.row(row_id)["Debit"] == 1
+    assert journal.redo_label() == f"Ubah ID {row_id}"
+
+
+def test_undo_after_edit_by_other_session_is_rejected_and_kept(ledger):
+    journal, other = UndoJournal(), UndoJournal()
+    row_id = ledger.add(_row(1), journal=journal)
+    ledger.update(row_id, _row(2), journal=journal)
+
+    # Sesi lain mengedit baris yang sama dengan versi yang ia baca
+    ledger.update(row_id, _row(5), expected_version=ledger.row_version(row_id), journal=other)
+
+    label = journal.undo_label()
+    with pytest.raises(LedgerConflict):
+        journal.undo(ledger)
+    assert ledger.row(row_id)["Debit"] == 5
+    assert journal.can_undo and journal.undo_label() == label
+    assert not journal.can_redo
+
+    # Sesi lain masih bisa membatalkan editnya sendiri
+    other.undo(ledger)
+    assert ledger.row(row_id)["Debit"] == 2
+
+
+def test_stale_edit_form_is_rejected(ledger):
+    row_id = ledger.add(_row(1))
+    version = ledger.row_version(row_id)
+    ledger.update(row_id, _row(2), expected_version=version)
+
+    with pytest.raises(LedgerConflict):
+        ledger.update(row_id, _row(3), expected_version=version)
+    assert ledger.row(row_id)["Debit"] == 2
@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keuangan_akun import ChartOfAccounts  # noqa: E402
+from keuangan_index import AccountIndex, DateIndex, MonthlyBalanceIndex, TextIndex  # noqa: E402
+from keuangan_ledger import Ledger, editor_changes  # noqa: E402
+from keuangan_store import DEFAULT_KATEGORI_LIST, DEFAULT_KATEGORI_MAP, LedgerStore  # noqa: E402
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    store = LedgerStore(str(tmp_path / "keuangan.db"))
+    store.init_chart(DEFAULT_KATEGORI_MAP, DEFAULT_KATEGORI_LIST)
+    return Ledger(store)
+
+
+def test_editor_new_row_with_empty_cells_gets_defaults(ledger):
+    # st.data_editor tidak menyertakan sel kosong di added_rows
+    delta = {"added_rows": [{"Tanggal": "2024-01-02", "Akun": "Kas", "Debit": 5}]}
+    _, inserts, _ = editor_changes(ledger, [], delta, ledger.chart.kategori_map)
+    assert inserts[0]["Deskripsi"] == ""
+    assert inserts[0]["Kredit"] == 0
+    assert inserts[0]["Kategori"] == "Aset"
+
+
+@pytest.mark.parametrize("values, message", [
+    ({"Tanggal": "2024-01-02", "Debit": 5}, "akun wajib diisi"),
+    ({"Akun": "Kas", "Debit": 5}, "tanggal wajib diisi"),
+])
+def test_editor_new_row_without_required_fields_is_rejected(ledger, values, message):
+    with pytest.raises(ValueError, match=message):
+        editor_changes(ledger, [], {"added_rows": [values]}, ledger.chart.kategori_map)
+
+
+def test_cached_evicts_entries_from_older_versions(ledger):
+    row = {"Tanggal": "2024-01-01", "Deskripsi": "", "Akun": "Kas", "Kategori": "Aset",
+           "Debit": 1, "Kredit": 0}
+    discarded = []
+    assert ledger.cached("a", lambda: "v1", discarded.append) == "v1"
+    assert ledger.cached("b", lambda: b"blob") == b"blob"
+    assert ledger.cached("a", lambda: "lagi") == "v1"
+
+    ledger.add(row)
+    assert ledger.cached("a", lambda: "v2", discarded.append) == "v2"
+    assert discarded == ["v1"]
+    assert list(ledger._cache) == ["a"]
+
+
+def test_add_many_frame_matches_row_dicts(ledger):
+    frame = pd.DataFrame({
+        "Tanggal": pd.to_datetime(["2024-01-31 10:00", "2024-02-01 00:00"]),
+        "Deskripsi": ["a", None],
+        "Akun": ["Kas", "Modal"],
+        "Kategori": ["Aset", "Ekuitas"],
+        "Debit": [100, 0],
+        "Kredit": [0, 100],
+    })
+    ids = ledger.add_many(frame)
+
+    assert ledger.row(ids[0])["Tanggal"] == pd.Timestamp("2024-01-31")
+    assert ledger.row(ids[1])["Deskripsi"] == ""
+    assert [str(m) for m in ledger.months()] == ["2024-01", "2024-02"]
+    assert ledger.balance_table()["Saldo"].tolist() == [100, -100]
+
+
+def test_indexes_match_rebuild_after_random_mutations(ledger):
+    random.seed(7)
+    akuns = ["Kas", "Bank", "Modal", "Beban"]
+
+    def row():
+        akun = random.choice(akuns)
+        return {"Tanggal": f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+                "Deskripsi": random.choice(["sewa kantor", "gaji", "sewa gudang", ""]),
+                "Akun": akun, "Kategori": DEFAULT_KATEGORI_MAP[akun],
+                "Debit": random.randint(0, 100), "Kredit": random.randint(0, 100)}
+
+    ids = ledger.add_many([row() for _ in range(100)])  # lewat jalur batch add_many
+    for _ in range(300):
+        op = random.random()
+        if op < 0.4:
+            ids.append(ledger.add(row()))
+        elif op < 0.7:
+            ledger.update(random.choice(ids), row())
+        else:
+            ledger.delete(ids.pop(random.randrange(len(ids))))
+
+    frame = ledger.frame
+    accounts = AccountIndex.from_frame(frame)
+    assert {a: (b.keys, b.saldo()) for a, b in ledger.accounts.books.items() if len(b)} == {
+        a: (b.keys, b.saldo()) for a, b in accounts.books.items() if len(b)
+    }
+    assert ledger.dates.keys == DateIndex.from_frame(frame).keys
+    text = TextIndex.from_frame(frame)
+    assert (ledger.text.postings, ledger.text.tokens) == (text.postings, text.tokens)
+    assert ledger.monthly.totals == MonthlyBalanceIndex.from_frame(frame).totals
+    chart = ChartOfAccounts.from_frame(frame, ledger.chart.kategori_map)
+    assert (ledger.chart.usage, ledger.chart.subtotals) == (chart.usage, chart.subtotals)
@@ -0,0 +1,32 @@
+import os
+import sys
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keuangan_profiling import finish_rerun, start_rerun  # noqa: E402
+
+
+def test_memory_tracing_stays_on_until_last_session_finishes():
+    started, release = threading.Event(), threading.Event()
+    result = {}
+
+    def other_session():
+        start_rerun(memory=True)
+        started.set()
+        release.wait()
+        result["profile"] = finish_rerun()
+
+    start_rerun(memory=True)
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    started.wait()
+
+    assert finish_rerun().peak_kb is not None
+    assert tracemalloc.is_tracing()  # sesi lain masih mengukur
+
+    release.set()
+    thread.join()
+    assert result["profile"].peak_kb is not None
+    assert not tracemalloc.is_tracing()